@@ -0,0 +1,80 @@
+import batch
+import matplotlib.pyplot as plt
+import montecarlo
+import style
+
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
+
+# --- 2. 数据准备 (montecarlo.py: 每个随机图 SEEDS 个独立实现的在线统计) ---
+SEEDS = montecarlo.SEEDS
+
+
+def _band(ax, x, reducer, color, label, step=False):
+    """中位数 + 25-75 / 5-95 百分位带"""
+    q = montecarlo.bands(reducer)
+    kw = {'step': 'post'} if step else {}
+    ax.fill_between(x, q[5], q[95], color=color, alpha=0.12, linewidth=0, **kw)
+    ax.fill_between(x, q[25], q[75], color=color, alpha=0.25, linewidth=0, **kw)
+    if step:
+        return ax.step(x, q[50], where='post', color=color, linewidth=1.5, label=label)[0]
+    return ax.plot(x, q[50], color=color, linewidth=1.5, label=label)[0]
+
+
+def _finish(fig, ax, handles, path, loc):
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend(handles=handles, loc=loc, prop=style.font(size=12), frameon=True, edgecolor='black',
+              fancybox=False)
+    plt.tight_layout()
+    plt.savefig(path, format='pdf', bbox_inches='tight')
+    batch.show(fig)
+
+
+def plot_ring(res):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    t = res['time'].mean
+    handles = [_band(ax, t, res['logical_iops'], '#d62728', 'QEMU'),
+               _band(ax, t, res['physical_iops'], '#2ca02c', 'HPRO')]
+    ax.set_xlabel('时间 (s)', fontsize=16)
+    ax.set_ylabel('物理 I/O 提交频率 (IOPS)', fontsize=16)
+    ax.set_xlim(0, 60)
+    ax.set_ylim(-100, 4000)
+    _finish(fig, ax, handles, 'ring_mc.pdf', 'upper right')
+
+
+def plot_spi(res):
+    fig, ax1 = plt.subplots(figsize=(10, 6))
+    t = res['time'].mean
+    handles = [_band(ax1, t, res['lat_aggressive'], '#d62728', '激进策略', step=True),
+               _band(ax1, t, res['lat_conservative'], '#1f77b4', '保守策略', step=True),
+               _band(ax1, t, res['lat_hpro'], '#2ca02c', 'HPRO', step=True)]
+    ax1.set_xlabel('时间 (s)', fontsize=14)
+    ax1.set_ylabel('归一化 99% 尾延迟', fontsize=14)
+    ax1.set_ylim(0.5, 6.0)
+
+    ax2 = ax1.twinx()
+    handles.append(_band(ax2, t, res['spi'], 'gray', 'SPI', step=True))
+    ax2.set_ylabel('SPI 值', fontsize=14, color='dimgray')
+    ax2.set_ylim(0, 1.1)
+    ax2.tick_params(axis='y', labelcolor='dimgray')
+    _finish(fig, ax1, handles, 'spi_mc.pdf', 'upper left')
+
+
+def plot_drift(res):
+    fig, ax1 = plt.subplots(figsize=(10, 5))
+    t = range(len(res['intensity'].mean))
+    handles = [_band(ax1, t, res['intensity'], '#d62728', '总写入强度')]
+    ax1.set_xlabel('执行时间 (归一化)', fontsize=16)
+    ax1.set_ylabel('写入强度', fontsize=16)
+
+    ax2 = ax1.twinx()
+    handles.append(_band(ax2, t, res['peak'], '#1f77b4', '最热地址'))
+    ax2.set_ylabel('内存地址空间 (PFN)', fontsize=16)
+    ax2.set_ylim(0, 200)
+    _finish(fig, ax1, handles, 'drift_mc.pdf', 'upper right')
+
+
+if __name__ == "__main__":
+    plot_ring(montecarlo.run('ring', SEEDS))
+    plot_spi(montecarlo.run('spi', SEEDS))
+    plot_drift(montecarlo.run('drift', SEEDS))
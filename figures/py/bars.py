@@ -0,0 +1,172 @@
+import importlib
+
+import batch
+import matplotlib.pyplot as plt
+import numpy as np
+import results
+import style
+
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
+
+# --- 2. 各系统的配色与纹理 (白底 + 彩色边框 + 纹理) ---
+# 学术配色 (Tab10: Green, Blue, Red, Orange)
+QEMU = {'edgecolor': '#2ca02c', 'hatch': '////'}
+MLLS = {'edgecolor': '#1f77b4', 'hatch': '...'}
+FLIC = {'edgecolor': '#d62728', 'hatch': 'xx'}
+HPRO = {'edgecolor': '#ff7f0e', 'hatch': '++'}
+# 模型估计 (而非实测) 的 HPRO 系列: 同色、不同纹理
+HPRO_MODEL = {'edgecolor': '#ff7f0e', 'hatch': '\\\\'}
+
+# 规格 (spec) 中未给出的字段取这里的默认值
+# 数据既可以直接写在 series 的 'data' 里，也可以给出 'metric' + 'workloads'，
+# 由各系列的 'system' 到结果库 (results.py) 中读取，多次重复实验时自动画误差棒。
+# 系列可以用自己的 'metric' 覆盖整张图的指标；'optional' 为真的系列在结果库中
+# 还没有数据时不画
+DEFAULTS = {
+    'scale': 1.0,          # 单位换算，例如 1 / 1000 (ms -> s)
+    'width': 0.18,
+    'figsize': (12, 5),
+    'ylim': None,
+    'legend': 'upper left',
+    'ncol': 2,
+}
+
+# 批量渲染时可由本模块一次画完的脚本
+SPEC_MODULES = ['acc', 'dt3b', 'dt4b', 'du3b', 'du4b', 'gran', 'pl3b', 'pl4b']
+
+
+def _load(spec):
+    """spec 给出 metric 时从结果库读取各系列的均值和标准差"""
+    if 'metric' not in spec:
+        return spec
+
+    series = []
+    for s in spec['series']:
+        try:
+            mean, std, n = results.stats(s.get('metric', spec['metric']), [s['system']],
+                                         spec['workloads'])
+        except KeyError:
+            if s.get('optional'):
+                continue
+            raise
+        if s.get('optional') and not n.any():
+            continue
+        err = std[0] if (n[0] > 1).any() else None
+        series.append({'label': s['system'], **s, 'data': mean[0], 'err': err})
+
+    categories = spec.get('categories') or [results.label(w) for w in spec['workloads']]
+    return {**spec, 'categories': categories, 'series': series}
+
+
+def _series(spec):
+    scale = spec['scale']
+    return [np.asarray(s['data'], dtype=float) * scale for s in spec['series']]
+
+
+def _has_errors(spec):
+    return any(s.get('err') is not None for s in spec['series'])
+
+
+def _layout(spec):
+    if _has_errors(spec):
+        # 误差棒的线段不便原地更新，每次都重画
+        return None
+    return (len(spec['categories']), len(spec['series']), spec['width'], tuple(spec['figsize']))
+
+
+# --- 3. 绘图 ---
+def _draw(ax, spec):
+    """在空白的坐标轴上画出整组柱子，返回每个系列的 BarContainer"""
+    x = np.arange(len(spec['categories']))
+    width = spec['width']
+    n = len(spec['series'])
+
+    containers = []
+    for i, (s, values) in enumerate(zip(spec['series'], _series(spec))):
+        # 第 i 个系列相对类别中心的偏移: (i - (n-1)/2) * width
+        offset = (i - (n - 1) / 2) * width
+        err = s.get('err')
+        if err is not None:
+            err = np.asarray(err, dtype=float) * spec['scale']
+        containers.append(ax.bar(x + offset, values, width, label=s['label'], color='white',
+                                 edgecolor=s['edgecolor'], hatch=s['hatch'], linewidth=1.5,
+                                 yerr=err, capsize=3 if err is not None else 0))
+
+    ax.set_xticks(x)
+    ax.yaxis.grid(True, linestyle='--', alpha=0.3)
+    ax.set_axisbelow(True)  # 确保网格在柱子下方
+    return containers
+
+
+def _update(containers, spec):
+    """布局相同时直接复用已有的柱子，只改高度、颜色和图例文字"""
+    for container, s, values in zip(containers, spec['series'], _series(spec)):
+        container.set_label(s['label'])
+        for rect, value in zip(container.patches, values):
+            rect.set_height(value)
+            rect.set_edgecolor(s['edgecolor'])
+            rect.set_hatch(s['hatch'])
+
+
+def _decorate(ax, spec):
+    ax.set_ylabel(spec['ylabel'], fontsize=16)
+    ax.set_xticklabels(spec['categories'], fontsize=14)
+    if spec['ylim'] is not None:
+        ax.set_ylim(*spec['ylim'])
+    else:
+        ax.relim()
+        ax.autoscale_view()
+
+    # 图例设置 (带黑色边框，无圆角)
+    ax.legend(loc=spec['legend'], frameon=True, edgecolor='black',
+              fancybox=False, fontsize=12, ncol=spec['ncol'])
+
+
+class _Canvas:
+    """批量渲染时共用的画布：布局不变就复用柱子，只有布局变化时才重画"""
+
+    def __init__(self):
+        self.fig = None
+        self.ax = None
+        self.layout = None
+        self.containers = None
+
+    def render(self, spec):
+        spec = _load({**DEFAULTS, **spec})
+        layout = _layout(spec)
+
+        if self.fig is None:
+            self.fig, self.ax = plt.subplots(figsize=spec['figsize'])
+        if layout is None or layout != self.layout:
+            self.ax.clear()
+            self.fig.set_size_inches(spec['figsize'])
+            self.containers = _draw(self.ax, spec)
+            self.layout = layout
+        else:
+            _update(self.containers, spec)
+
+        _decorate(self.ax, spec)
+        self.fig.tight_layout()
+        self.fig.savefig(spec['output'], format='pdf', bbox_inches='tight')
+        return self.fig
+
+
+def render(spec):
+    """按照 spec 画一张分组柱状图并保存到 spec['output']"""
+    fig = _Canvas().render(spec)
+    batch.show(fig)
+
+
+def render_batch(specs):
+    """在同一张画布上依次渲染多张图"""
+    canvas = _Canvas()
+    for spec in specs:
+        canvas.render(spec)
+    if canvas.fig is not None:
+        plt.close(canvas.fig)
+
+
+if __name__ == '__main__':
+    # python bars.py 一次渲染全部分组柱状图
+    render_batch([importlib.import_module(name).SPEC for name in SPEC_MODULES])
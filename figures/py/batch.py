@@ -0,0 +1,22 @@
+import os
+
+import matplotlib
+
+# --- 批处理渲染模式 ---
+# run.py 构建时会设置 FIG_BATCH=1: 使用非交互后端 (Agg)，不弹出窗口，
+# 画完立即关闭图像，避免一个工作进程连续渲染多张图时内存不断累积。
+# 单独调试某张图时照常 python acc.py 即可弹窗；也可以手动 FIG_BATCH=1 python acc.py
+BATCH = os.environ.get('FIG_BATCH', '') not in ('', '0')
+
+if BATCH:
+    matplotlib.use('Agg')
+
+
+def show(fig=None):
+    """交互模式下显示图像；批处理模式下直接关闭图像"""
+    import matplotlib.pyplot as plt
+
+    if BATCH:
+        plt.close(fig if fig is not None else 'all')
+    else:
+        plt.show()
@@ -1,24 +1,30 @@
+import batch
+import dynbatch
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as font_manager
 import numpy as np
+import os
+import results
+import style
 
-# --- 1. 字体与风格设置 ---
-# 优先使用黑体/宋体显示中文，Times New Roman 显示数字/英文
-plt.rcParams['font.sans-serif'] = ['SimHei', 'SimSun', 'Arial Unicode MS'] 
-plt.rcParams['axes.unicode_minus'] = False
-plt.rcParams['font.size'] = 14
-plt.rcParams['axes.linewidth'] = 1.5
-plt.rcParams['axes.unicode_minus'] = False # 解决负号显示问题
-plt.rcParams['xtick.direction'] = 'in'
-plt.rcParams['ytick.direction'] = 'in'
-
-def plot_continuous_snapshot_cn():
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
+
+# CONT_MODEL=1: 改由 dynbatch.py 模拟可用性 (各负载并行，traces/ 下有 TinyLlama 的
+# 脏页 trace 时使用 trace)，图例标注为模型估计；默认取结果库 results/ 中实测的 availability
+MODEL = os.environ.get('CONT_MODEL', '') not in ('', '0')
+
+
+def load_availability():
+    """各 TinyLlama 负载占比% 下的可用性，见 MODEL"""
+    if MODEL:
+        res = dynbatch.sweep(dynbatch.LOADS)
+        return list(res), [r['availability'] for r in res.values()]
+    return results.series('availability', 'TinyLlama', 'HPRO')
+
+
+def plot_continuous_snapshot_cn(loads, availability_raw, path='cont.pdf', model=False):
     # --- 2. 数据准备 ---
-    # 将分类标签改为 TinyLlama 负载占比%
-    categories = ['0', '10', '20', '50', '100']
-    
-    # 原始数据 (数据不动)
-    availability_raw = [0.3, 1.7, 5.6, 22.3, 100] 
+    categories = [str(load) for load in loads]
     
     # 计算批处理大小
     packed_size = [100 / x for x in availability_raw]
@@ -33,19 +39,20 @@ def plot_continuous_snapshot_cn():
     # --- 3. 绘图 ---
     x = np.arange(len(categories))
     width = 0.45 
+    suffix = ' (模型)' if model else ''
 
     fig, ax1 = plt.subplots(figsize=(8, 5))
 
     # --- 柱状图 (左轴：可用性指数) ---
     # 标签改为中文
-    rects = ax1.bar(x, log_availability, width, label='可用性指数', 
+    rects = ax1.bar(x, log_availability, width, label='可用性指数' + suffix, 
                     hatch='////', edgecolor='#1f77b4', color='white', linewidth=1.5)
 
     # --- 折线图 (右轴：批处理粒度) ---
     ax2 = ax1.twinx()
     # 标签改为中文
     line, = ax2.plot(x, log2_packed_size, color='#d62728', marker='o', linestyle='-', 
-                     label='平均批处理粒度 ($\log_2$)', markersize=8, markerfacecolor='white', markeredgewidth=1.5)
+                     label='平均批处理粒度 ($\log_2$)' + suffix, markersize=8, markerfacecolor='white', markeredgewidth=1.5)
 
     # --- 4. 轴标签与刻度 (全部中文) ---
     ax1.set_ylabel('可用性指数 ($\log_{10}$)', fontsize=16)
@@ -74,14 +81,14 @@ def plot_continuous_snapshot_cn():
     lines2, labels2 = ax2.get_legend_handles_labels()
     
     # 图例字体设置
-    font_prop = font_manager.FontProperties(family=['SimHei', 'SimSun'], size=12)
+    font_prop = style.font(size=12)
     
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper center', 
                prop=font_prop, frameon=True, edgecolor='black', fancybox=False, ncol=2)
 
     plt.tight_layout()
-    plt.savefig('cont.pdf', format='pdf', bbox_inches='tight')
-    plt.show()
+    plt.savefig(path, format='pdf', bbox_inches='tight')
+    batch.show(fig)
 
 if __name__ == "__main__":
-    plot_continuous_snapshot_cn()
\ No newline at end of file
+    plot_continuous_snapshot_cn(*load_availability(), model=MODEL)
\ No newline at end of file
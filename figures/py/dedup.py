@@ -0,0 +1,219 @@
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- 基于指纹库的全页去重模拟 (flash.tex) ---
+# 1. 指纹: 每个 4KB 页面看作 512 个 uint64，每个字乘以随位置变化的奇数乘子后先经
+#    MurmurHash3 的 fmix64 逐字打散，再以两组权重求和 (按 2^64 取模) 得到两条通道，
+#    两条通道循环移位异或后再 fmix64 一次，得到 128 位指纹。求和之前必须先做非线性打散:
+#    直接对 字 × 乘子 求和是模 2^64 的线性运算，两个字的最高位同时翻转 (如两个 float64 取反)
+#    时 2^63 + 2^63 ≡ 0，指纹不变。HPRO 本身使用 MurmurHash3，这里换成可以整批向量化的
+#    等宽哈希，只用于统计去重率
+# 2. 指纹库: 开放寻址 (线性探测) 哈希表，键和值都存放在 NumPy 数组里
+# 3. 内存转储用 np.memmap 打开，按页范围分给进程池计算指纹，主进程依次查表
+PAGE = 4096
+WORDS = PAGE // 8
+BATCH = 1 << 14         # 每批计算指纹的页数 (64MB)
+MIX = 64                # 逐字打散时每块的页数 (256KB)
+RANGE = 1 << 16         # 每个作业负责的页数 (256MB)
+MAX_LOAD = 0.5          # 指纹库的最大装载率
+EMPTY = np.uint32(0xFFFFFFFF)
+
+_MULT = np.random.default_rng(0x5EED).integers(1, 1 << 63, (WORDS, 2), dtype=np.uint64) | np.uint64(1)
+
+
+def _fmix(h, tmp=None):
+    """MurmurHash3 的 64 位终结函数 (原地修改 h；tmp 为同形状的临时缓冲区)"""
+    tmp = np.empty_like(h) if tmp is None else tmp
+    np.right_shift(h, np.uint64(33), out=tmp)
+    h ^= tmp
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    np.right_shift(h, np.uint64(33), out=tmp)
+    h ^= tmp
+    h *= np.uint64(0xC4CEB9FE1A85EC53)
+    np.right_shift(h, np.uint64(33), out=tmp)
+    h ^= tmp
+    return h
+
+
+def _rotl(h, r):
+    return (h << np.uint64(r)) | (h >> np.uint64(64 - r))
+
+
+def fingerprint(pages):
+    """(n, 512) uint64 页面 -> (n, 2) uint64 指纹
+
+    每个字只打散一次: 通道 0 为 Σ fmix(w_i · a_i)，通道 1 为 Σ fmix(w_i · a_i) · b_i；
+    按 MIX 页一块计算，临时数组留在缓存里
+    """
+    pages = np.asarray(pages)
+    lanes = np.empty((len(pages), 2), dtype=np.uint64)
+    h = np.empty((MIX, WORDS), dtype=np.uint64)
+    tmp = np.empty_like(h)
+    for s in range(0, len(pages), MIX):
+        n = min(MIX, len(pages) - s)
+        np.multiply(pages[s:s + n], _MULT[:, 0], out=h[:n])
+        _fmix(h[:n], tmp[:n])
+        lanes[s:s + n, 0] = h[:n].sum(axis=1, dtype=np.uint64)
+        h[:n] *= _MULT[:, 1]
+        lanes[s:s + n, 1] = h[:n].sum(axis=1, dtype=np.uint64)
+    return _fmix(lanes ^ _rotl(lanes[:, ::-1], 31))
+
+
+def open_dump(path):
+    """以 (页数, 512) 的 uint64 memmap 打开原始内存转储，末尾不足一页的部分忽略"""
+    n = os.path.getsize(path) // PAGE
+    return np.memmap(path, dtype=np.uint64, mode='r', shape=(n, WORDS))
+
+
+def _hash_range(path, start, stop):
+    pages = open_dump(path)
+    out = np.empty((stop - start, 2), dtype=np.uint64)
+    for s in range(start, stop, BATCH):
+        e = min(s + BATCH, stop)
+        out[s - start:e - start] = fingerprint(pages[s:e])
+    return out
+
+
+class FingerprintTable:
+    """开放寻址指纹库: 128 位指纹 -> 存储位置 (实际写入的页面按写入顺序编号)"""
+
+    def __init__(self, capacity=1 << 16, max_load=MAX_LOAD):
+        self.max_load = max_load
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.size = 0
+        self.mask = capacity - 1
+        self.hi = np.zeros(capacity, dtype=np.uint64)
+        self.lo = np.zeros(capacity, dtype=np.uint64)
+        self.loc = np.full(capacity, EMPTY, dtype=np.uint32)
+
+    @property
+    def capacity(self):
+        return self.mask + 1
+
+    @property
+    def nbytes(self):
+        return self.hi.nbytes + self.lo.nbytes + self.loc.nbytes
+
+    def _grow(self, incoming):
+        need = self.size + incoming
+        if need <= self.max_load * self.capacity:
+            return
+        capacity = self.capacity
+        while need > self.max_load * capacity:
+            capacity *= 2
+        used = self.loc != EMPTY
+        keys, locs = np.stack([self.hi[used], self.lo[used]], axis=1), self.loc[used]
+        self._alloc(capacity)
+        self._probe(keys, locs)
+
+    def _probe(self, keys, locs=None):
+        """逐轮线性探测。locs 为 None 时为查询/插入，新键依次分配存储位置；返回 (是否命中, 位置)"""
+        n = len(keys)
+        hit = np.zeros(n, dtype=bool)
+        out = np.empty(n, dtype=np.uint32)
+        pos = (keys[:, 1] & np.uint64(self.mask)).astype(np.intp)
+        pending = np.arange(n)
+        while len(pending):
+            p = pos[pending]
+            occupied = self.loc[p] != EMPTY
+            same = occupied & (self.hi[p] == keys[pending, 0]) & (self.lo[p] == keys[pending, 1])
+            hit[pending[same]] = True
+            out[pending[same]] = self.loc[p[same]]
+
+            # 空槽: 同一轮里抢同一个槽的只有第一个能写入，其余下一轮重新检查该槽
+            cand, slots = pending[~occupied], p[~occupied]
+            _, first = np.unique(slots, return_index=True)
+            win, slots = cand[first], slots[first]
+            self.hi[slots], self.lo[slots] = keys[win, 0], keys[win, 1]
+            if locs is None:
+                out[win] = self.size + np.arange(len(win), dtype=np.uint32)
+            else:
+                out[win] = locs[win]
+            self.loc[slots] = out[win]
+            self.size += len(win)
+
+            lost = np.ones(len(cand), dtype=bool)
+            lost[first] = False
+            step = pending[occupied & ~same]
+            pos[step] = (pos[step] + 1) & self.mask
+            # 保持下标有序: 同一指纹总是由批内最早的页面写入
+            pending = np.sort(np.concatenate([cand[lost], step]))
+        return hit, out
+
+    def insert(self, keys):
+        """查询一批指纹，未命中的加入指纹库；返回每个页面是否重复 (命中库或同批中更早的页面)"""
+        self._grow(len(keys))
+        return self._probe(keys)[0]
+
+
+def simulate(paths, workers=None):
+    """依次把每个转储加入指纹库，返回每一步累计的统计 (与 eval.tex 中按虚拟机数量列表一致)"""
+    workers = workers or os.cpu_count() or 1
+    table = FingerprintTable()
+    jobs = []
+    for path in paths:
+        n = len(open_dump(path))
+        jobs += [(path, s, min(s + RANGE, n)) for s in range(0, n, RANGE)]
+
+    rows, raw, stored = [], 0, 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(job[0], pool.submit(_hash_range, *job)) for job in jobs]
+        for i, (path, future) in enumerate(futures):
+            keys = future.result()
+            dup = table.insert(keys)
+            raw += len(keys) * PAGE
+            stored += np.count_nonzero(~dup) * PAGE
+            if i + 1 == len(futures) or futures[i + 1][0] != path:
+                rows.append({'dump': path, 'raw': raw, 'stored': stored, 'saved': raw - stored,
+                             'ratio': 1 - stored / max(raw, 1), 'table': table.nbytes,
+                             'elapsed': time.perf_counter() - start})
+    return rows
+
+
+def synthetic_dumps(directory, n_vms=4, pages=1 << 18, shared=0.6, zero=0.15, seed=0):
+    """生成同构虚拟机的内存转储: 公共镜像页 (内核、libc 等) + 零页 + 私有随机页"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 1 << 64, (int(pages * shared), WORDS), dtype=np.uint64)
+    paths = []
+    for vm in range(n_vms):
+        kind = rng.choice(3, size=pages, p=[shared, zero, 1 - shared - zero])
+        dump = np.zeros((pages, WORDS), dtype=np.uint64)
+        is_image = kind == 0
+        dump[is_image] = image[rng.integers(0, len(image), np.count_nonzero(is_image))]
+        private = kind == 2
+        dump[private] = rng.integers(0, 1 << 64, (np.count_nonzero(private), WORDS), dtype=np.uint64)
+        path = os.path.join(directory, f'vm{vm + 1}.raw')
+        dump.tofile(path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全页去重模拟')
+    parser.add_argument('dump', nargs='*', help='原始内存转储 (按顺序依次加入指纹库)')
+    parser.add_argument('--demo', type=int, metavar='N', help='生成 N 个虚拟机的合成转储来演示')
+    parser.add_argument('--pages', type=int, default=1 << 18, help='合成转储的页数 (默认 1GB)')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.dump or synthetic_dumps(tmp, args.demo or 4, args.pages)
+        print(f'{"转储":<24}{"原始 (MB)":>12}{"去重后 (MB)":>14}{"节省 (MB)":>12}'
+              f'{"去重率":>10}{"指纹库 (MB)":>14}{"吞吐 (GB/s)":>14}')
+        for row in simulate(paths, args.jobs):
+            print(f'{os.path.basename(row["dump"]):<24}{row["raw"] / 2**20:>12.0f}'
+                  f'{row["stored"] / 2**20:>14.0f}{row["saved"] / 2**20:>12.0f}'
+                  f'{row["ratio"]:>10.1%}{row["table"] / 2**20:>14.1f}'
+                  f'{row["raw"] / row["elapsed"] / 2**30:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
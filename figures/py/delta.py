@@ -0,0 +1,180 @@
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# --- 细粒度提取: 不同子块粒度下的增量体积 (flash.tex / eval.tex) ---
+# 两个版本的内存镜像按 uint64 逐字比较，得到 (页数, 512) 的 "字是否变化" 矩阵，
+# 再 reshape 成 (页数, 子块数, 每块字数) 后 any() 归约为子块位图；
+# 粗粒度的位图由 64B 位图两两 OR 归约得到，不重复比较原始数据。
+# 只统计脏页 (至少有一个字变化的页面):
+#   增量字节 = 变化且非全零的子块数 × 粒度 (全零子块只在元数据中标记)
+#   元数据   = 每个脏页两张位图 (变化位图 + 全零位图)，各 4096 / 粒度 位
+PAGE = 4096
+WORDS = PAGE // 8
+GRANULARITIES = [64, 128, 256, 512, 1024, PAGE]
+BATCH = 1 << 14         # 每批比较的页数 (2 × 64MB)
+RANGE = 1 << 17         # 每个作业负责的页数 (512MB)
+
+
+def open_image(path):
+    """以 (页数, 512) 的 uint64 memmap 打开内存镜像"""
+    n = os.path.getsize(path) // PAGE
+    return np.memmap(path, dtype=np.uint64, mode='r', shape=(n, WORDS))
+
+
+def _reduce(bits, factor):
+    """子块位图沿页内方向每 factor 个做 OR"""
+    return bits.reshape(len(bits), -1, factor).any(axis=2)
+
+
+def diff(old, new, granularities=GRANULARITIES):
+    """比较一批页面，返回 {粒度: (脏页的变化位图, 增量字节, 元数据字节)}
+
+    位图形状为 (脏页数, 4096 / 粒度)，按页面顺序排列
+    """
+    old, new = np.asarray(old), np.asarray(new)
+    changed = old != new
+    dirty = changed.any(axis=1)
+    changed, new = changed[dirty], new[dirty]
+
+    step = min(granularities) // 8
+    bits = _reduce(changed, step)                 # 最细粒度的变化位图
+    nonzero = _reduce(new != 0, step)              # 最细粒度的非零位图
+    out, size = {}, min(granularities)
+    for g in sorted(granularities):
+        if g != size:
+            bits, nonzero = _reduce(bits, g // size), _reduce(nonzero, g // size)
+            size = g
+        chunks = PAGE // g
+        delta = np.count_nonzero(bits & nonzero) * g
+        meta = len(bits) * 2 * -(-chunks // 8)
+        out[g] = (bits, delta, meta)
+    return out
+
+
+def _diff_range(old_path, new_path, start, stop, granularities, keep_bitmaps):
+    old, new = open_image(old_path), open_image(new_path)
+    delta, meta = dict.fromkeys(granularities, 0), dict.fromkeys(granularities, 0)
+    pages = dict.fromkeys(granularities, 0)    # 各粒度的位图行数相同，都是脏页数
+    bitmaps = {g: [] for g in granularities}
+    for s in range(start, stop, BATCH):
+        e = min(s + BATCH, stop)
+        result = diff(old[s:e], new[s:e], granularities)
+        for g, (bits, d, m) in result.items():
+            pages[g] += len(bits)
+            delta[g] += d
+            meta[g] += m
+            if keep_bitmaps:
+                bitmaps[g].append(np.packbits(bits, axis=1))
+    dirty = max(pages.values(), default=0)
+    if keep_bitmaps:
+        bitmaps = {g: np.concatenate(b) if b else np.empty((0, -(-PAGE // g // 8)), np.uint8)
+                   for g, b in bitmaps.items()}
+    return dirty, delta, meta, bitmaps if keep_bitmaps else None
+
+
+def compare(old_path, new_path, granularities=GRANULARITIES, workers=None, keep_bitmaps=False):
+    """按页范围并行比较两个镜像
+
+    返回 dict: dirty (脏页数), delta / meta ({粒度: 字节})，
+    pct ({粒度: 增量占脏页全页体积的百分比})，keep_bitmaps 时还有 bitmaps ({粒度: 打包的位图})
+    """
+    n = min(len(open_image(old_path)), len(open_image(new_path)))
+    workers = workers or os.cpu_count() or 1
+    jobs = [(old_path, new_path, s, min(s + RANGE, n), granularities, keep_bitmaps)
+            for s in range(0, n, RANGE)]
+    dirty, delta, meta = 0, dict.fromkeys(granularities, 0), dict.fromkeys(granularities, 0)
+    bitmaps = {g: [] for g in granularities}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for d, dl, m, b in pool.map(_diff_range, *zip(*jobs)):
+            dirty += d
+            for g in granularities:
+                delta[g] += dl[g]
+                meta[g] += m[g]
+                if keep_bitmaps:
+                    bitmaps[g].append(b[g])
+    result = {'pages': n, 'dirty': dirty, 'delta': delta, 'meta': meta,
+              'pct': {g: 100.0 * delta[g] / max(dirty * PAGE, 1) for g in granularities}}
+    if keep_bitmaps:
+        result['bitmaps'] = {g: np.concatenate(b) for g, b in bitmaps.items()}
+    return result
+
+
+def label(g):
+    """结果库中各粒度的系列名"""
+    return f'{g}B'
+
+
+def ingest(workload, result, run=None):
+    """把各粒度的增量体积占比 (delta_volume_pct) 追加到结果库，作为新的一次实验"""
+    import results
+
+    if run is None:
+        try:
+            run = int(np.max(results.column('run'))) + 1
+        except OSError:
+            run = 0
+    grans = list(result['pct'])
+    results.append({'workload': [workload] * len(grans), 'system': [label(g) for g in grans],
+                    'metric': ['delta_volume_pct'] * len(grans), 'run': [run] * len(grans),
+                    'value': [result['pct'][g] for g in grans]},
+                   {'delta_volume_pct': '%'})
+
+
+def synthetic_images(directory, pages=1 << 18, dirty=0.3, writes=(1, 16), width=(8, 128),
+                     zero=0.2, seed=0):
+    """生成一对镜像: 部分页面的随机位置写入若干小段 (记录更新等稀疏写入)，
+    其中 zero 比例的写入段为清零 (释放/初始化)"""
+    rng = np.random.default_rng(seed)
+    old = rng.integers(1, 256, pages * PAGE, dtype=np.uint8)
+    new = old.copy()
+    page = np.flatnonzero(rng.random(pages) < dirty)
+    count = rng.integers(*writes, len(page))
+    length = rng.integers(*width, count.sum())
+    start = np.repeat(page * PAGE, count) + rng.integers(0, PAGE - length + 1)
+    # 每段写入展开为逐字节下标，一次性赋值
+    offset = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+    fill = rng.integers(1, 256, len(offset), dtype=np.uint8)
+    fill[np.repeat(rng.random(len(length)) < zero, length)] = 0
+    new[np.repeat(start, length) + offset] = fill
+    paths = [os.path.join(directory, name) for name in ('old.img', 'new.img')]
+    old.tofile(paths[0])
+    new.tofile(paths[1])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='子页增量提取: 各粒度的增量体积与元数据开销')
+    parser.add_argument('images', nargs='*', help='前后两个原始内存镜像 (old new)')
+    parser.add_argument('--demo', action='store_true', help='生成一对合成镜像来演示')
+    parser.add_argument('--pages', type=int, default=1 << 18, help='合成镜像的页数 (默认 1GB)')
+    parser.add_argument('--ingest', metavar='WORKLOAD', help='把结果追加到结果库')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    args = parser.parse_args()
+    if len(args.images) not in (0, 2) or (not args.images and not args.demo):
+        parser.error('需要两个镜像 (old new)，或使用 --demo')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.images or synthetic_images(tmp, args.pages)
+        start = time.perf_counter()
+        result = compare(*paths, workers=args.jobs)
+        elapsed = time.perf_counter() - start
+
+    dirty = result['dirty'] * PAGE
+    print(f'{result["pages"]} 页，其中脏页 {result["dirty"]} ({dirty / 2**20:.0f} MB)，'
+          f'{2 * result["pages"] * PAGE / elapsed / 2**30:.2f} GB/s')
+    print(f'{"粒度":>8}{"增量 (MB)":>12}{"占脏页 (%)":>12}{"元数据 (KB)":>14}{"合计 (%)":>10}')
+    for g in result['delta']:
+        delta, meta = result['delta'][g], result['meta'][g]
+        print(f'{label(g):>8}{delta / 2**20:>12.1f}{result["pct"][g]:>12.2f}'
+              f'{meta / 2**10:>14.1f}{100 * (delta + meta) / max(dirty, 1):>10.2f}')
+    if args.ingest:
+        ingest(args.ingest, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+import argparse
+import collections
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import aging
+import heatmap
+import numpy as np
+import results
+
+# --- 脏页 trace 的二进制格式 ---
+# 32 字节文件头 + 定长记录 (小端，紧密排列，每条 20 字节):
+#   time   uint64  纳秒时间戳，按时间升序
+#   pfn    uint64  客户机物理页帧号
+#   flags  uint32  见下方 FLAG_*
+# 文件头记录客户机的总页数，"从未写入的页面" 也需要计入统计
+# 读取时用 np.memmap 按块访问，数 GB 的 trace 不会一次性读入内存
+MAGIC = b'DPTRACE\0'
+VERSION = 1
+HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4'),
+                   ('n_pages', '<u8'), ('reserved', '<u8')])
+RECORD = np.dtype([('time', '<u8'), ('pfn', '<u8'), ('flags', '<u4')])
+
+FLAG_WRITE = 0x1    # 普通写入 (脏位置位)
+FLAG_HUGE = 0x2     # 大页 (2MB) 上的写入
+
+CHUNK = 1 << 22     # 每块记录数 (约 80MB)
+TRACES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+SAMPLE_INTERVAL = 0.2  # 脏位扫描周期 (s)，见 hotspot.tex
+
+
+# --- 1. 写入 ---
+class Writer:
+    """按块追加记录: with Writer(path, n_pages) as w: w.write(time_ns, pfn, flags)"""
+
+    def __init__(self, path, n_pages):
+        self.f = open(path, 'wb')
+        header = np.zeros((), dtype=HEADER)
+        header['magic'], header['version'] = MAGIC, VERSION
+        header['record_size'], header['n_pages'] = RECORD.itemsize, n_pages
+        self.f.write(header.tobytes())
+
+    def write(self, time_ns, pfn, flags=FLAG_WRITE):
+        records = np.empty(len(pfn), dtype=RECORD)
+        records['time'], records['pfn'], records['flags'] = time_ns, pfn, flags
+        self.f.write(records.tobytes())
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def from_csv(src, dst, n_pages=None, chunksize=1_000_000, sep=','):
+    """把文本/CSV 日志转换为二进制 trace
+
+    需要 time (秒) 与 pfn 两列，flags 列可省略；n_pages 缺省时取最大 PFN + 1。
+    time 必须按升序排列 (允许相等)，否则抛出 ValueError
+    """
+    import pandas as pd
+
+    def read():
+        return pd.read_csv(src, sep=sep, chunksize=chunksize, engine='python' if sep != ',' else 'c')
+
+    if n_pages is None:
+        n_pages = max(int(df['pfn'].max()) for df in read()) + 1
+    count, last = 0, 0
+    with Writer(dst, n_pages) as w:
+        for df in read():
+            time_ns = np.round(df['time'].to_numpy() * 1e9).astype(np.uint64)
+            # dirty_counts / windows 等都按时间有序读取，乱序的记录会被算错而不会报错
+            back = np.flatnonzero(np.diff(time_ns.astype(np.int64), prepend=last) < 0)
+            if len(back):
+                w.close()
+                os.remove(dst)
+                raise ValueError(f'{src}: 第 {count + back[0] + 1} 条记录的时间戳早于上一条，'
+                                 f'需要先按 time 排序')
+            flags = df['flags'].to_numpy() if 'flags' in df else FLAG_WRITE
+            w.write(time_ns, df['pfn'].to_numpy(), flags)
+            count += len(df)
+            if len(time_ns):
+                last = int(time_ns[-1])
+    return count
+
+
+# --- 2. 读取 ---
+def header(path):
+    h = np.fromfile(path, dtype=HEADER, count=1)
+    if len(h) == 0 or h['magic'][0] != MAGIC.rstrip(b'\0'):
+        raise ValueError(f'{path}: 不是脏页 trace 文件')
+    if h['version'][0] != VERSION or h['record_size'][0] != RECORD.itemsize:
+        raise ValueError(f'{path}: 不支持的 trace 版本 {h["version"][0]}')
+    return {'n_pages': int(h['n_pages'][0])}
+
+
+def open_trace(path):
+    """以只读 memmap 打开全部记录"""
+    header(path)
+    n = (os.path.getsize(path) - HEADER.itemsize) // RECORD.itemsize
+    return np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.itemsize, shape=(n,))
+
+
+def chunks(path, size=CHUNK):
+    """顺序读出 (time, pfn, flags) 数据块"""
+    records = open_trace(path)
+    for start in range(0, len(records), size):
+        block = np.array(records[start:start + size])
+        yield block['time'], block['pfn'], block['flags']
+
+
+def windows(path, width, size=CHUNK):
+    """按时间窗 (秒) 切分，每次给出若干个完整的窗口: (窗口编号, time, pfn)
+
+    窗口编号从 trace 的第一条记录起算，跨块的窗口会被拼接完整后再给出
+    """
+    width_ns = int(round(width * 1e9))
+    t0 = None
+    carry_t = carry_p = None
+    for t, p, _ in chunks(path, size):
+        if t0 is None:
+            if len(t) == 0:
+                continue
+            t0 = int(t[0])
+        if carry_t is not None:
+            t, p = np.concatenate([carry_t, t]), np.concatenate([carry_p, p])
+        w = ((t - t0) // width_ns).astype(np.int64)
+        # 最后一个窗口可能还没读完，留到下一块
+        cut = np.searchsorted(w, w[-1])
+        if cut:
+            yield w[:cut], t[:cut], p[:cut]
+        carry_t, carry_p = t[cut:], p[cut:]
+    if carry_t is not None and len(carry_t):
+        yield ((carry_t - t0) // width_ns).astype(np.int64), carry_t, carry_p
+
+
+def frames(path, interval=SAMPLE_INTERVAL, size=CHUNK):
+    """逐个采样周期给出被写过的页面 (去重后的 PFN)，空闲的周期给出空数组"""
+    expected = 0
+    for w, _, p in windows(path, interval, size):
+        bounds = np.flatnonzero(np.diff(w)) + 1
+        for idx, pages in zip(w[np.r_[0, bounds]], np.split(p, bounds)):
+            for _ in range(expected, idx):
+                yield np.empty(0, dtype=np.uint64)
+            yield np.unique(pages)
+            expected = idx + 1
+
+
+# --- 3. 统计 ---
+# 快照周期内的脏化次数只关心 0..buckets-1 次 (最后一档为 ">=")，
+# 每页一个饱和 uint8 计数器即可；PFN 空间过大 (稀疏) 时改为按页号排序合并的稀疏计数
+SNAPSHOT_PERIOD = 1.0
+DENSE_LIMIT = 1 << 28   # 稠密计数器上限: 256M 页 (1TB 客户机)，占 256MB
+
+
+def _runs(pages):
+    """排序后的 (不同页面, 各自出现的次数)"""
+    s = np.sort(pages)
+    starts = np.flatnonzero(np.r_[True, s[1:] != s[:-1]]) if len(s) else np.empty(0, dtype=np.intp)
+    return s[starts], np.diff(np.r_[starts, len(s)])
+
+
+class PageCounter:
+    """一个快照周期内每个页面的写入次数，饱和于 cap；一个周期可以分多次 add"""
+
+    def __init__(self, n_pages, cap=5, dense=None):
+        self.n_pages, self.cap = n_pages, cap
+        if dense is None:
+            dense = n_pages <= DENSE_LIMIT
+        self.counts = np.zeros(n_pages, dtype=np.uint8) if dense else None
+        self.parts = []
+
+    def add(self, pages):
+        self.add_runs(*_runs(pages))
+
+    def add_runs(self, pages, runs):
+        """pages 为去重后的页面，runs 为各自的写入次数"""
+        runs = np.minimum(runs, self.cap).astype(np.uint8)
+        if self.counts is not None:
+            self.counts[pages] = np.minimum(self.counts[pages] + runs, self.cap)
+            self.parts.append(pages)
+        else:
+            self.parts.append((pages, runs))
+
+    def close(self, hist):
+        """把本周期的分布累加到 hist 上，并清零计数器"""
+        if self.counts is not None:
+            touched = 0
+            for pages in self.parts:
+                # 读出后立即清零，之后的 part 再遇到同一页面时读到 0，不会重复计数
+                counts = self.counts[pages]
+                self.counts[pages] = 0
+                counts = counts[counts > 0]
+                hist += np.bincount(counts, minlength=len(hist))
+                touched += len(counts)
+            hist[0] += self.n_pages - touched
+            self.parts = []
+            return
+        if self.parts:
+            uniq, inverse = np.unique(np.concatenate([p for p, _ in self.parts]),
+                                      return_inverse=True)
+            runs = np.bincount(inverse, weights=np.concatenate([r for _, r in self.parts]))
+            counts = np.minimum(runs, self.cap).astype(np.intp)
+        else:
+            counts = np.empty(0, dtype=np.intp)
+        hist += np.bincount(counts, minlength=len(hist))
+        hist[0] += self.n_pages - len(counts)
+        self.parts = []
+
+
+def _search(times, values, stride=4096):
+    """在 (memmap 上的) 有序时间列中二分查找，只读入每 stride 条取一条的粗索引和命中的小段"""
+    coarse = np.asarray(times[::stride])
+    out = np.empty(len(values), dtype=np.intp)
+    for i, (block, value) in enumerate(zip(np.searchsorted(coarse, values), values)):
+        lo, hi = max(block - 1, 0) * stride, min(block * stride, len(times))
+        out[i] = lo + np.searchsorted(times[lo:hi], value)
+    return out
+
+
+def dirty_counts(path, period=SNAPSHOT_PERIOD, buckets=6, size=CHUNK):
+    """每个快照周期内页面被写入 0, 1, ..., >=buckets-1 次的页面占比 (%)，单遍扫描 trace"""
+    return dirty_counts_sweep(path, [period], buckets, size=size)[1][0]
+
+
+def dirty_counts_sweep(path, periods, buckets=6, base=None, size=CHUNK):
+    """一遍扫描同时统计多个快照周期，返回 (实际周期, 占比)，占比形状为 (周期数, buckets)
+
+    以基本窗口 base (默认取最短周期) 切分 trace，各周期取为 base 的整数倍:
+    每个基本窗口内的页面只排序一次，再把 (页面, 次数) 累加到各周期自己的计数器上。
+    窗口边界直接在 memmap 的时间列上二分查找，顺序读入的只有 PFN 列
+    """
+    n_pages = header(path)['n_pages']
+    records = open_trace(path)
+    base = base or min(periods)
+    mult = np.maximum(np.round(np.asarray(periods) / base).astype(np.int64), 1)
+    if len(records) == 0:
+        return mult * base, np.zeros((len(mult), buckets))
+    t0, t1 = int(records['time'][0]), int(records['time'][-1])
+    width = int(round(base * 1e9))
+    n_windows = (t1 - t0) // width + 1
+    edges = _search(records['time'], t0 + width * np.arange(1, n_windows, dtype=np.uint64))
+    edges = np.r_[0, edges, len(records)]
+
+    counters = [PageCounter(n_pages, buckets - 1) for _ in mult]
+    hist = np.zeros((len(mult), buckets), dtype=np.int64)
+    dtype = np.uint32 if n_pages <= 1 << 32 else np.uint64
+    k = 0  # 当前基本窗口
+    for start in range(0, len(records), size):
+        end = min(start + size, len(records))
+        pfn = records['pfn'][start:end].astype(dtype)
+        # 块内按窗口切分，同一窗口跨块时计数器继续累加
+        while True:
+            stop = min(edges[k + 1], end)
+            pages, runs = _runs(pfn[max(edges[k], start) - start:stop - start])
+            for counter in counters:
+                counter.add_runs(pages, runs)
+            if edges[k + 1] > end:
+                break
+            k += 1
+            for i in np.flatnonzero(k % mult == 0):
+                counters[i].close(hist[i])
+            if k == n_windows:
+                break
+    # 最后一个不完整的周期
+    for i in np.flatnonzero(n_windows % mult):
+        counters[i].close(hist[i])
+    n_periods = -(-n_windows // mult)
+    return mult * base, 100.0 * hist / (n_periods[:, None] * n_pages)
+
+
+def dirty_counts_many(paths, period=SNAPSHOT_PERIOD, buckets=6, workers=None):
+    """多个负载并行统计: {负载: trace 路径} -> {负载: 各档占比}"""
+    if not paths:
+        return {}
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {w: pool.submit(dirty_counts, p, period, buckets) for w, p in paths.items()}
+        return {w: f.result() for w, f in futures.items()}
+
+
+def find(workload):
+    """traces/ 目录下该负载的 trace 路径，不存在时返回 None"""
+    path = os.path.join(TRACES, workload + '.dpt')
+    return path if os.path.exists(path) else None
+
+
+def samples(path, interval=SAMPLE_INTERVAL, horizon=5):
+    """热点检测的输入流: (本周期脏位图, 真实工作集 = 之后 horizon 个周期内被写过的页面)"""
+    n_pages = header(path)['n_pages']
+    window = collections.deque()
+    for pages in frames(path, interval):
+        window.append(pages)
+        if len(window) > horizon:
+            dirty = np.zeros(n_pages, dtype=bool)
+            dirty[window.popleft().astype(np.intp)] = True
+            truth = np.zeros(n_pages, dtype=bool)
+            for future in window:
+                truth[future.astype(np.intp)] = True
+            yield dirty, truth
+
+
+def heat(path, interval, shape):
+    """写入热度图 (地址 × 采样周期)，每个格为该周期内对该页的写入次数，池化到 shape"""
+    n_pages = header(path)['n_pages']
+    records = open_trace(path)
+    if len(records) == 0:
+        return np.zeros(shape)
+    n_steps = int((int(records['time'][-1]) - int(records['time'][0])) // round(interval * 1e9)) + 1
+    grid = np.full(shape[0] * shape[1], -np.inf)
+    for w, _, p in windows(path, interval):
+        keys, counts = np.unique(w * n_pages + p.astype(np.int64), return_counts=True)
+        heatmap.pool_into(grid, keys, counts.astype(float), n_pages, n_steps, shape)
+    grid[np.isneginf(grid)] = 0.0
+    return grid.reshape(shape)
+
+
+# --- 4. 命令行 ---
+def _next_run():
+    try:
+        return int(np.max(results.column('run'))) + 1
+    except OSError:
+        return 0
+
+
+def ingest(path, workload, period, run=None):
+    """从 trace 计算 dirty_count_pct 与 wss_accuracy，作为新的一次实验追加到结果库"""
+    run = _next_run() if run is None else run
+    pct = dirty_counts(path, period)
+    results.append({'workload': [workload] * len(pct), 'system': ['-'] * len(pct),
+                    'metric': ['dirty_count_pct'] * len(pct), 'run': [run] * len(pct),
+                    'step': list(range(len(pct))), 'value': list(pct)},
+                   {'dirty_count_pct': '%'})
+    acc_hpro, acc_lru, _ = aging.run(samples(path), header(path)['n_pages'], lru_capacity=None)
+    aging.ingest(workload, acc_hpro, acc_lru, run=run)
+    return pct, acc_hpro.mean(), acc_lru.mean()
+
+
+def ingest_shift(before, after, workload, run=None):
+    """两段 trace 首尾相接 (before 之后切换到 after)，把逐采样的识别准确率追加到
+    wss_accuracy_shift；两段 trace 的总页数必须相同。返回 (切换点, acc_hpro, acc_lru)"""
+    n_pages = header(before)['n_pages']
+    if header(after)['n_pages'] != n_pages:
+        raise ValueError(f'{before} 与 {after} 的总页数不同，无法拼接')
+    switch = sum(1 for _ in samples(before))
+    stream = itertools.chain(samples(before), samples(after))
+    acc_hpro, acc_lru, _ = aging.run(stream, n_pages, lru_capacity=None)
+    aging.ingest(workload, acc_hpro, acc_lru, shift=True, run=_next_run() if run is None else run)
+    return switch, acc_hpro, acc_lru
+
+
+def main():
+    parser = argparse.ArgumentParser(description='脏页 trace 工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_conv = sub.add_parser('convert', help='文本/CSV 日志 -> 二进制 trace')
+    p_conv.add_argument('src')
+    p_conv.add_argument('dst')
+    p_conv.add_argument('--pages', type=int, help='客户机总页数 (默认取最大 PFN + 1)')
+    p_conv.add_argument('--sep', default=',', help=r"列分隔符，空白分隔的日志用 '\s+'")
+    p_info = sub.add_parser('info', help='查看 trace 概况')
+    p_info.add_argument('trace')
+    p_ingest = sub.add_parser('ingest', help='统计 trace 并追加到结果库')
+    p_ingest.add_argument('workload')
+    p_ingest.add_argument('trace')
+    p_ingest.add_argument('--period', type=float, default=SNAPSHOT_PERIOD, help='快照周期 (s)')
+    p_ingest.add_argument('--run', type=int, help='实验编号 (默认接在已有编号之后)')
+    p_shift = sub.add_parser('shift', help='两段 trace 拼接为一次负载切换，逐采样准确率追加到结果库')
+    p_shift.add_argument('before')
+    p_shift.add_argument('after')
+    p_shift.add_argument('--workload', help='结果库中的负载名 (默认 "前->后"，取 trace 文件名)')
+    p_shift.add_argument('--run', type=int, help='实验编号 (默认接在已有编号之后)')
+    p_hist = sub.add_parser('hist', help='并行统计多个 trace 的脏化次数分布')
+    p_hist.add_argument('trace', nargs='+')
+    p_hist.add_argument('--period', type=float, default=SNAPSHOT_PERIOD, help='快照周期 (s)')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        print(f'{args.dst}: 写入 {from_csv(args.src, args.dst, args.pages, sep=args.sep)} 条记录')
+    elif args.command == 'info':
+        records = open_trace(args.trace)
+        span = (int(records['time'][-1]) - int(records['time'][0])) / 1e9 if len(records) else 0
+        print(f'{len(records)} 条记录, {header(args.trace)["n_pages"]} 页, 时长 {span:.3f}s')
+    elif args.command == 'hist':
+        start = time.perf_counter()
+        pct = dirty_counts_many(dict(enumerate(args.trace)), args.period)
+        elapsed = time.perf_counter() - start
+        events = sum(len(open_trace(path)) for path in args.trace)
+        for i, path in enumerate(args.trace):
+            print(f'{path}: {np.round(pct[i], 2)}')
+        print(f'{events} 条记录, 耗时 {elapsed:.2f}s ({events / elapsed / 1e6:.0f}M 条/s)')
+    elif args.command == 'shift':
+        names = [os.path.splitext(os.path.basename(p))[0] for p in (args.before, args.after)]
+        workload = args.workload or '->'.join(names)
+        switch, hpro, lru = ingest_shift(args.before, args.after, workload, args.run)
+        for name, acc in (('HPRO', hpro), ('LRU', lru)):
+            print(f'{workload} {name:<5} 切换前 {acc[:switch].mean():5.1f}%  '
+                  f'恢复于第 {aging.settle_time(acc, switch)} 个采样')
+    else:
+        pct, hpro, lru = ingest(args.trace, args.workload, args.period, args.run)
+        print(f'{args.workload}: 脏化次数分布 {np.round(pct, 2)}  准确率 HPRO {hpro:.1f}% / LRU {lru:.1f}%')
+
+
+if __name__ == '__main__':
+    main()
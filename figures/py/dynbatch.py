@@ -0,0 +1,218 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import dptrace
+import numpy as np
+import spimode
+
+# --- 连续快照: 基于 SPI 的动态增量批处理 (strategy.tex) ---
+# 1. 模式由 SPI 经 spimode 的迟滞状态机给出 (阈值 0.3 / 0.6):
+#      低延迟模式 (SPI < 0.3): 批处理粒度固定为 1 页，每次写入立即落盘 (写时复制)
+#      标准模式:               粒度在 [1, MAX_BATCH] 之间按双重触发规则伸缩
+#      聚合写模式 (SPI > 0.6): 粒度不低于 AGG_MIN (64KB)，同样按双重触发规则伸缩
+# 2. 双重触发: 缓冲区中的不同页面数在 T_wait 内达到粒度 -> 立即落盘，粒度翻倍；
+#    T_wait 到期仍未达到 -> 落盘 (缓冲区非空时)，粒度减半。每次落盘后定时器重新计时
+# 3. 模式切换时先把缓冲区落盘，再把粒度限制到新模式的范围内
+# 4. 可用性 = 100 · N_flush / N_dirty (eval.tex)，平均批处理粒度 = N_dirty / N_flush (次写入)；
+#    落盘时延为每个页面从进入缓冲区到落盘的时间
+T_LOW, T_HIGH = 0.3, 0.6
+T_WAIT = 0.05            # 定时器周期 (s)
+MAX_BATCH = 512          # 缓冲区上限 (2MB)
+AGG_MIN = 16             # 聚合写模式的最小粒度 (64KB)
+BOUNDS = {spimode.LOW: (1, 1), spimode.STANDARD: (1, MAX_BATCH),
+          spimode.HIGH: (AGG_MIN, MAX_BATCH)}
+DURATION = 120.0         # 一个快照间隔 (eval.tex 中为 2 分钟)
+LOADS = [0, 10, 20, 50, 100]
+SPI_IDLE, SPI_BUSY = 0.2, 0.9   # 0% / 100% TinyLlama 负载时的平均 SPI
+PERCENTILES = [50, 90, 99]
+
+
+def spi_series(rng, load, duration=DURATION, interval=dptrace.SAMPLE_INTERVAL, noise=0.02):
+    """负载占比 load (%) 下的 SPI 采样序列: 在空闲与满载之间线性插值，叠加测量噪声"""
+    t = np.arange(0, duration, interval)
+    level = SPI_IDLE + (SPI_BUSY - SPI_IDLE) * load / 100
+    return t, np.clip(level + rng.normal(0, noise, len(t)), 0.0, 1.0)
+
+
+def synthetic_stream(rng, duration=DURATION, rate=20000, hot_pages=4096, space=1 << 18, zipf_a=1.3):
+    """脏页写入序列 (时间, PFN)，按时间排序: Poisson 到达，页面服从 Zipf 分布"""
+    n = rng.poisson(rate * duration)
+    ts = np.sort(rng.random(n)) * duration
+    pages = (np.minimum(rng.zipf(zipf_a, n), hot_pages) - 1 + rng.integers(0, space // hot_pages, n)
+             * hot_pages) % space
+    return ts, pages
+
+
+def read_trace(path, duration=DURATION):
+    """从 dptrace 文件读出前 duration 秒的 (时间, PFN)，时间从第一条记录起算"""
+    ts, pages, t0 = [], [], None
+    for t, p, _ in dptrace.chunks(path):
+        if not len(t):
+            continue
+        t0 = int(t[0]) if t0 is None else t0
+        t = (t - t0) / 1e9
+        stop = np.searchsorted(t, duration)
+        ts.append(t[:stop])
+        pages.append(p[:stop].astype(np.int64))
+        if stop < len(t):
+            break
+    if not ts:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    return np.concatenate(ts), np.concatenate(pages)
+
+
+def mix(rng, busy, idle, load):
+    """负载混合: 按 load (%) 抽稀业务负载的写入，与空闲背景写入按时间合并"""
+    keep = rng.random(len(busy[0])) < load / 100
+    ts = np.concatenate([busy[0][keep], idle[0]])
+    pages = np.concatenate([busy[1][keep], idle[1]])
+    order = np.argsort(ts, kind='stable')
+    return ts[order], pages[order]
+
+
+class _Flushes:
+    """落盘记录: 每次落盘的不同页面数与各页面的落盘时延"""
+
+    def __init__(self):
+        self.sizes, self.latency = [], []
+
+    def add(self, at, ts, first):
+        """at 时刻落盘；ts 为本批写入的时刻，first 为各个不同页面第一次写入的下标"""
+        if len(ts):
+            self.sizes.append(len(first))
+            self.latency.append(at - ts[first])
+
+
+def simulate(ts, pages, spi_t, spi, t_wait=T_WAIT, bounds=BOUNDS):
+    """回放写入序列，返回 dict:
+      flushes / dirty     落盘次数与写入次数
+      availability        可用性 (%)
+      granularity         平均批处理粒度 (次写入 / 次落盘)
+      batch_hist          每次落盘的不同页面数的分布 (下标 k 对应 [2^k, 2^(k+1)) 页)
+      latency_pct         页面落盘时延的分位数 (s)
+      modes               各模式下的写入数
+    """
+    machine = spimode.ModeMachine(t_low=T_LOW, t_high=T_HIGH)
+    modes, _ = machine.feed(spi_t, spi)
+    # 模式分段: 每段的起止时刻与模式
+    change = np.flatnonzero(np.diff(modes)) + 1
+    seg_start = np.concatenate([[-np.inf], spi_t[change]])
+    seg_end = np.concatenate([spi_t[change], [np.inf]])
+    seg_mode = modes[np.concatenate([[0], change])]
+
+    out = _Flushes()
+    cow = 0                      # 低延迟模式下逐页落盘的次数
+    per_mode = np.zeros(3, dtype=np.int64)
+    size = 1
+    last = 0.0                   # 上次落盘 (定时器重新计时) 的时刻
+    for start, end, mode in zip(seg_start, seg_end, seg_mode):
+        lo, hi = bounds[mode]
+        size = min(max(size, lo), hi)
+        a, b = np.searchsorted(ts, [start, end])
+        per_mode[mode] += b - a
+        if hi == 1:
+            # 每次写入都立即落盘，整段一次算完
+            cow += b - a
+            last = ts[b - 1] if b > a else last
+            continue
+
+        pos = a
+        while pos < b:
+            deadline = last + t_wait
+            if ts[pos] >= deadline:
+                # 缓冲区为空时定时器到期: 粒度按到期次数连续减半
+                expired = int((ts[pos] - last) // t_wait)
+                size = max(size >> min(expired, 31), lo)
+                last += expired * t_wait
+                continue
+            stop = min(pos + int(np.searchsorted(ts[pos:b], min(deadline, end))), b)
+            window = pages[pos:stop]
+            uniq, first = np.unique(window, return_index=True)
+            if len(uniq) >= size:
+                # 容量触发: 第 size 个不同页面写入时落盘，粒度翻倍
+                k = int(np.partition(first, size - 1)[size - 1]) + 1
+                first = np.sort(first)[:size]
+                at = ts[pos + k - 1]
+                out.add(at, ts[pos:pos + k], first)
+                size = min(size * 2, hi)
+                last, pos = at, pos + k
+            elif stop < b or deadline <= end:
+                # 时间触发: 缓冲区落盘，粒度减半
+                out.add(deadline, ts[pos:stop], first)
+                size = max(size // 2, lo)
+                last, pos = deadline, stop
+            else:
+                # 模式切换: 先把缓冲区落盘
+                out.add(end, ts[pos:stop], first)
+                last, pos = end, stop
+
+    sizes = np.asarray(out.sizes, dtype=np.int64)
+    flushes = cow + len(sizes)
+    dirty = len(ts)
+    latency = np.concatenate(out.latency + [np.zeros(cow)])
+    hist = np.bincount(np.log2(np.maximum(sizes, 1)).astype(np.int64),
+                       minlength=int(np.log2(MAX_BATCH)) + 1)
+    hist[0] += cow
+    return {
+        'flushes': flushes,
+        'dirty': dirty,
+        'availability': 100.0 * flushes / max(dirty, 1),
+        'granularity': dirty / max(flushes, 1),
+        'batch_hist': hist,
+        'latency_pct': dict(zip(PERCENTILES, np.percentile(latency, PERCENTILES)))
+        if len(latency) else {q: 0.0 for q in PERCENTILES},
+        'modes': per_mode,
+    }
+
+
+def run(load, workload='TinyLlama', duration=DURATION, seed=0):
+    """负载占比 load (%) 下的一次模拟；traces/ 下有对应 trace 时使用 trace，否则使用合成写入"""
+    rng = np.random.default_rng([seed, load])
+    busy_path, idle_path = dptrace.find(workload), dptrace.find('Idle')
+    busy = read_trace(busy_path, duration) if busy_path else synthetic_stream(rng, duration)
+    idle = (read_trace(idle_path, duration) if idle_path
+            else synthetic_stream(rng, duration, rate=50, hot_pages=256))
+    ts, pages = mix(rng, busy, idle, load)
+    spi_t, spi = spi_series(rng, load, duration)
+    return simulate(ts, pages, spi_t, spi)
+
+
+def sweep(loads=LOADS, workload='TinyLlama', duration=DURATION, seed=0, workers=None):
+    """并行模拟各个负载占比，返回 {负载: 结果}"""
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(loads))) as pool:
+        futures = {load: pool.submit(run, load, workload, duration, seed) for load in loads}
+        return {load: f.result() for load, f in futures.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='连续快照动态增量批处理模拟')
+    parser.add_argument('--loads', type=int, nargs='+', default=list(range(0, 101, 10)),
+                        help='TinyLlama 负载占比 (%%)')
+    parser.add_argument('--duration', type=float, default=DURATION, help='模拟时长 (s)')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    parser.add_argument('--figure', metavar='PDF', help='用模拟结果绘制 cont.py 的图')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    res = sweep(args.loads, duration=args.duration, workers=args.jobs)
+    print(f'{"负载 (%)":>8}{"写入":>10}{"落盘":>9}{"可用性 (%)":>12}{"粒度":>8}'
+          + ''.join(f'{"p" + str(q) + " (ms)":>11}' for q in PERCENTILES) + '  低/标准/聚合 (%)')
+    for load, r in res.items():
+        share = 100 * r['modes'] / max(r['dirty'], 1)
+        print(f'{load:>8}{r["dirty"]:>10}{r["flushes"]:>9}{r["availability"]:>12.2f}'
+              f'{r["granularity"]:>8.1f}'
+              + ''.join(f'{r["latency_pct"][q] * 1e3:>11.2f}' for q in PERCENTILES)
+              + '  ' + '/'.join(f'{s:.0f}' for s in share))
+    print(f'耗时 {time.perf_counter() - start:.2f}s')
+
+    if args.figure:
+        import cont
+
+        cont.plot_continuous_snapshot_cn(list(res), [r['availability'] for r in res.values()], args.figure)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import bars
+
+# --- 细粒度提取: 不同粒度下的脏数据体积 (eval.tex 表 tab:granularity) ---
+# 数据可由 delta.py --ingest 从内存镜像对中重新测得
+SPEC = {
+    'output': 'gran.pdf',
+    'metric': 'delta_volume_pct',
+    'workloads': ['Idle', 'SQLite', 'OpenCV', 'YOLO', 'TinyLlama', '7zip'],
+    'series': [
+        {'system': '64B', 'label': '64 B', 'edgecolor': '#9467bd', 'hatch': '\\\\\\\\'},
+        {'system': '256B', 'label': '256 B', **bars.HPRO},
+        {'system': '1024B', 'label': '1024 B', 'edgecolor': '#17becf', 'hatch': '--'},
+        {'system': '4096B', 'label': '4096 B (全页)', 'edgecolor': '#7f7f7f', 'hatch': '////'},
+    ],
+    'ylabel': '脏数据体积占比 (%)',
+    # 全页粒度恒为 100，上方留出图例的位置
+    'ylim': (0, 125),
+    'legend': 'upper center',
+    'ncol': 4,
+}
+
+if __name__ == "__main__":
+    bars.render(SPEC)
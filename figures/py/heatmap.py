@@ -0,0 +1,212 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+# --- 地址 × 时间写入热度图的合成 (drift.py) ---
+# 热度以稀疏事件 (addr, t, value) 的形式生成，整条随机游走和全部火花都一次性向量化生成，
+# 最后用一次 np.bincount 累加。键按 "时间优先" 展开 (t * n_addr + addr)，
+# 因此按时间分块读取只需 searchsorted，地址空间可以扩展到 1M 页 × 10k 采样
+# 绘图时按时间分块累加，每块立即 max/sum 池化到输出像素网格上，
+# 内存占用只取决于像素数和单块事件数，PDF 中只嵌入一张压缩位图
+
+
+def _clamped_walk(start, steps, lo, hi):
+    """x[i] = clip(x[i-1] + steps[i], lo, hi)，只在真正触边的位置做修正"""
+    x = start + np.cumsum(steps)
+    i = 0
+    while True:
+        out = np.flatnonzero((x[i:] < lo) | (x[i:] > hi))
+        if len(out) == 0:
+            return x
+        i += out[0]
+        # 触边后从边界重新出发，之后的路径整体平移
+        x[i:] += np.clip(x[i], lo, hi) - x[i]
+        i += 1
+
+
+def wandering_hotspot(rng, n_addr, start_addr, t_start, t_end, drift_speed=2.0,
+                      spread=5.0, intensity=25, margin=10, sparks=(5, 25)):
+    """一个随时间随机上下漂移的热点群，返回 (addr, t, value)
+
+    drift_speed: 漂移速度 (越大越剧烈)
+    spread: 离散程度 (越大火花越散)
+    sparks: 每个时刻的火花数范围 [lo, hi)，模拟访问的突发性
+    """
+    n = t_end - t_start
+    # 1. 中心漂移: 带边界保护的随机游走
+    center = _clamped_walk(float(start_addr), rng.normal(0, drift_speed, n),
+                           margin, n_addr - margin)
+
+    # 2. 撒点: 在每个时刻的中心周围生成若干火花 (正态分布: 中心密集，边缘稀疏)
+    counts = rng.integers(*sparks, size=n)
+    t = np.repeat(np.arange(t_start, t_end), counts)
+    addr = rng.normal(np.repeat(center, counts), spread).astype(np.int64)
+    addr = np.clip(addr, 0, n_addr - 1)
+
+    # 3. 写入强度
+    value = rng.normal(intensity, 5, size=len(t))
+    return addr, t, value
+
+
+def scatter(rng, n_addr, n_steps, count, loc=15, scale=5):
+    """全图随机闪现的火花 (如 GC、全局扫描)"""
+    t = rng.integers(0, n_steps, count)
+    addr = rng.integers(0, n_addr, count)
+    value = rng.normal(loc, scale, count)
+    order = np.argsort(t, kind='stable')
+    return addr[order], t[order], value[order]
+
+
+def accumulate(events, n_addr):
+    """把若干组事件合并为稀疏热度 (keys, values)，keys = t * n_addr + addr，升序"""
+    addr = np.concatenate([e[0] for e in events])
+    t = np.concatenate([e[1] for e in events])
+    value = np.concatenate([e[2] for e in events])
+    keys, inverse = np.unique(t.astype(np.int64) * n_addr + addr, return_inverse=True)
+    return keys, np.bincount(inverse, weights=value)
+
+
+def pool_into(grid, keys, values, n_addr, n_steps, shape, how='max'):
+    """把已累加好的格 (keys = t * n_addr + addr) 池化进展平的像素网格 grid"""
+    rows, cols = shape
+    t = keys // n_addr
+    pixel = (keys - t * n_addr) * rows // n_addr * cols + t * cols // n_steps
+    if how == 'sum':
+        grid += np.bincount(pixel, weights=values, minlength=rows * cols)
+    else:
+        np.maximum.at(grid, pixel, values)
+
+
+def pool(events, n_addr, n_steps, shape=None, how='max', chunk=64):
+    """把事件池化到 shape = (行, 列) 的像素网格上，默认不降采样
+
+    每组事件须按 t 排序。按每 chunk 列一块处理: 块内先累加出每个 (addr, t) 格的强度，
+    再对落在同一像素内的格取最大值 (how='max') 或求和 (how='sum')
+    """
+    rows, cols = shape = shape or (n_addr, n_steps)
+    grid = np.zeros(rows * cols) if how == 'sum' else np.full(rows * cols, -np.inf)
+    first = -(-np.arange(cols + 1) * n_steps // cols)  # 每一列的第一个时刻
+    for c in range(0, cols, chunk):
+        t0, t1 = first[c], first[min(c + chunk, cols)]
+        part = []
+        for addr, t, value in events:
+            lo, hi = np.searchsorted(t, [t0, t1])
+            part.append((addr[lo:hi], t[lo:hi], value[lo:hi]))
+        keys, values = accumulate(part, n_addr)
+        pool_into(grid, keys, values, n_addr, n_steps, shape, how)
+    grid[np.isneginf(grid)] = 0.0  # 没有任何写入的像素
+    return grid.reshape(rows, cols)
+
+
+def plot(ax, grid, n_addr, n_steps, **kwargs):
+    """整张网格作为一张位图嵌入 (interpolation='none' 保留像素的颗粒感)"""
+    return ax.imshow(grid, aspect='auto', origin='lower', extent=[0, n_steps, 0, n_addr],
+                     interpolation='none', **kwargs)
+
+
+def frames(keys, values, n_addr, n_steps):
+    """逐个时刻给出 (被写入的地址, 写入强度)，可直接作为热点检测器的脏页输入"""
+    bounds = np.searchsorted(keys, np.arange(n_steps + 1) * n_addr)
+    for t in range(n_steps):
+        lo, hi = bounds[t], bounds[t + 1]
+        yield keys[lo:hi] - t * n_addr, values[lo:hi]
+
+
+def synthetic(rng, n_addr, n_steps, hotspots=16, noise=None):
+    """大规模压力测试用的漂移热度: 若干随机位置、随机生命周期的热点群 + 全图火花"""
+    events = []
+    for _ in range(hotspots):
+        t0, t1 = np.sort(rng.integers(0, n_steps + 1, 2))
+        events.append(wandering_hotspot(
+            rng, n_addr, rng.integers(10, n_addr - 10), t0, t1,
+            drift_speed=rng.uniform(0.2, 3.0) * n_addr / 200,
+            spread=rng.uniform(2.0, 8.0) * n_addr / 200, intensity=rng.uniform(15, 28)))
+    events.append(scatter(rng, n_addr, n_steps, noise if noise is not None else 3 * n_steps))
+    return events
+
+
+# --- drift.py 的场景: 模拟真实的复杂应用 ---
+HOTSPOTS = [
+    # 热点 A (主工作区，如 Heap): 从低地址开始，缓慢向高地址漂移，比较松散
+    dict(start_addr=40, t_start=0, t_end=100, drift_speed=1.5, spread=8.0, intensity=20),
+    # 热点 B (临时缓冲区，如 Buffer): 在中间某段时间突然出现，快速移动，然后消失
+    dict(start_addr=120, t_start=30, t_end=80, drift_speed=3.0, spread=4.0, intensity=28),
+    # 热点 C (系统/栈区，如 Stack): 始终在低地址徘徊，非常稳定，范围小
+    dict(start_addr=10, t_start=0, t_end=100, drift_speed=0.2, spread=2.0, intensity=15),
+]
+# 热点 D (突发的大范围扫描): 也就是你说的“星星之火”，全图随机闪现
+# 模拟偶尔的 GC (垃圾回收) 或 全局搜索
+SPARKS = 300
+
+
+def drift(rng, memory_space=200, time_steps=100):
+    """一次随机实现: 背景噪声 + 若干漂移热点与随机火花，返回 (地址, 时间) 热度网格 (未截断)
+
+    rng 为 RandomState 时 (兼容模式) 按原先的抽样顺序逐个时刻生成，见 _drift_legacy
+    """
+    if isinstance(rng, np.random.RandomState):
+        return _drift_legacy(rng, memory_space, time_steps)
+    # 初始化背景 (极低噪音，几乎全白)
+    background = rng.exponential(scale=0.1, size=(memory_space, time_steps))
+    events = [wandering_hotspot(rng, memory_space, **h) for h in HOTSPOTS]
+    events.append(scatter(rng, memory_space, time_steps, SPARKS))
+    # 所有热点一次累加 (网格与数据同尺寸，不降采样)
+    return pool(events, memory_space, time_steps) + background
+
+
+def _drift_legacy(rs, memory_space, time_steps):
+    """原先 np.random.seed(42) 之后逐个时刻调用 np.random 的版本，抽样顺序与累加顺序都不变，
+    用于逐位复现旧图 (FIG_LEGACY_RNG=1)"""
+    data = rs.exponential(scale=0.1, size=(memory_space, time_steps))
+    for h in HOTSPOTS:
+        center = h['start_addr']
+        for t in range(h['t_start'], h['t_end']):
+            center = np.clip(center + rs.normal(0, h['drift_speed']), 10, memory_space - 10)
+            n = rs.randint(5, 25)
+            addr = rs.normal(loc=center, scale=h['spread'], size=n).astype(int)
+            addr = np.clip(addr, 0, memory_space - 1)
+            np.add.at(data[:, t], addr, rs.normal(loc=h['intensity'], scale=5, size=n))
+    t = rs.randint(0, time_steps, SPARKS)
+    addr = rs.randint(0, memory_space, SPARKS)
+    np.add.at(data, (addr, t), rs.normal(15, 5, SPARKS))
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='合成大规模漂移热度')
+    parser.add_argument('--addr', type=int, default=1 << 20, help='地址 (页) 数')
+    parser.add_argument('--steps', type=int, default=10_000, help='采样时刻数')
+    parser.add_argument('--hotspots', type=int, default=16)
+    parser.add_argument('--render', metavar='PDF', help='池化后画成热度图')
+    parser.add_argument('--pixels', type=int, nargs=2, default=(800, 1600),
+                        metavar=('ROWS', 'COLS'), help='输出像素网格')
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    events = synthetic(np.random.default_rng(42), args.addr, args.steps, args.hotspots)
+    n_events = sum(len(e[0]) for e in events)
+    print(f'{args.addr} 地址 × {args.steps} 时刻: {n_events} 个写入事件, '
+          f'生成耗时 {time.perf_counter() - start:.2f}s')
+
+    if args.render:
+        import matplotlib
+        import matplotlib.pyplot as plt
+
+        start = time.perf_counter()
+        grid = pool(events, args.addr, args.steps, shape=tuple(args.pixels))
+        fig, ax = plt.subplots(figsize=(10, 5))
+        im = plot(ax, np.clip(grid, 0, 40), args.addr, args.steps,
+                  cmap=matplotlib.colormaps['OrRd'], vmin=0.5, vmax=35)
+        fig.colorbar(im, ax=ax)
+        fig.savefig(args.render, format='pdf', bbox_inches='tight')
+        plt.close(fig)
+        print(f'池化到 {args.pixels[0]}×{args.pixels[1]} 像素并保存, '
+              f'耗时 {time.perf_counter() - start:.2f}s')
+    print(f'峰值内存 {tracemalloc.get_traced_memory()[1] / 2**20:.0f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import bars
+import migrate
+import results
+
+# --- 模型预测的停机时间与总时间 (migrate.py，Raspberry Pi 4B 参数) ---
+# traces/ 下有对应负载的脏页 trace 时，负载参数由 trace 估计
+PARAMS = migrate.workload_params()
+PREDICTED = migrate.predict(PARAMS)
+STYLES = {'QEMU': bars.QEMU, 'MLLS': bars.MLLS, 'FLIC-DRAM': bars.FLIC, 'HPRO': bars.HPRO}
+
+
+def _spec(output, key, scale, ylabel, legend):
+    return {
+        'output': output,
+        'categories': [results.label(w) for w in PARAMS],
+        'series': [{'label': s, 'data': PREDICTED[s][key], **STYLES[s]} for s in migrate.SYSTEMS],
+        'scale': scale,
+        'ylabel': ylabel,
+        'legend': legend,
+    }
+
+
+SPECS = [
+    _spec('mig_dt.pdf', 'downtime', 1000.0, '预测停机时间 (ms)', 'upper left'),
+    _spec('mig_du.pdf', 'total', 1.0, '预测总时间 (s)', 'upper left'),
+]
+
+if __name__ == "__main__":
+    for spec in SPECS:
+        bars.render(spec)
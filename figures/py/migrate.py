@@ -0,0 +1,214 @@
+import argparse
+import csv
+import itertools
+import time
+
+import dptrace
+import numpy as np
+
+# --- 快照/迁移时间模型: 预拷贝 (QEMU)、MLLS、FLIC-DRAM 与 HPRO 的逐轮传输 ---
+# 1. 写入模型: 工作集 W 中热页占 hot、吸收 hot_share 的写入，其余为温页；
+#    时长 t 内被写脏的不同页面数按 Poisson 写入估计: W_x · (1 - exp(-R_x · t / W_x))
+# 2. 在线阶段逐轮传输: 第 0 轮传输全部非零页，之后每轮传输上一轮期间被写脏的页面，
+#    直到剩余脏页不超过 threshold、轮数用完或不再收敛；随后停机传输剩余页面
+# 3. 各系统的差别 (POLICIES):
+#      overhead  在线阶段脏页追踪 (写保护 / 硬件脏位) 占用的带宽比例
+#      accuracy  热页识别准确率，识别出的热页推迟到停机阶段一次传输 (在线阶段跳过)
+#      rounds    最大在线轮数；HPRO 只运行到热度模型收敛 (固定轮数)，不追求脏页下降
+#      ordered   每轮最后才发送工作集页面，只有发送之后再被写入的热页需要重传
+#      postcopy  停机阶段只传输热页，温页在恢复运行后由后拷贝补齐 (计入总时间)
+# 4. 所有参数都是数组，每个元素是一种配置 (负载 × 带宽 × ...)，逐轮推进时整批计算，
+#    一次可以评估上万种 what-if 组合
+PAGE = 4096
+MB = 2**20 // PAGE       # 每 MB 的页数
+STOP_COST = 0.02         # 停机阶段的固定开销: 设备状态保存等 (s)
+PROGRESS = 0.95          # 本轮脏页数不少于上一轮的 95% 时视为不再收敛
+SYSTEMS = ['QEMU', 'MLLS', 'FLIC-DRAM', 'HPRO']
+POLICIES = {
+    'QEMU':      {'overhead': 0.15, 'accuracy': 0.0, 'rounds': 30, 'threshold': 1.0,
+                  'ordered': False, 'postcopy': False},
+    # MLLS: 激进的预拷贝，在线阶段尽量保存工作集，收敛阈值更低
+    'MLLS':      {'overhead': 0.15, 'accuracy': 0.0, 'rounds': 30, 'threshold': 0.3,
+                  'ordered': True, 'postcopy': False},
+    'FLIC-DRAM': {'overhead': 0.15, 'accuracy': 0.7, 'rounds': 30, 'threshold': 1.0,
+                  'ordered': False, 'postcopy': False},
+    'HPRO':      {'overhead': 0.02, 'accuracy': 0.9, 'rounds': 3, 'threshold': 1.0,
+                  'ordered': False, 'postcopy': True},
+}
+# threshold 以 "停机目标时间 × 带宽" 为单位: 剩余脏页可在 DOWNTIME_TARGET 内传完即停止迭代
+DOWNTIME_TARGET = 0.3    # (s)
+
+# 各负载的默认参数 (Raspberry Pi 4B)；traces/ 下有该负载的 trace 时由 from_trace 估计
+#   pages: 非零页数，rate: 页面写入速率 (次/s)，wss: 工作集页数，hot: 热页占工作集的比例
+WORKLOADS = {
+    'Idle':      {'pages': 30000, 'rate': 300, 'wss': 2000, 'hot': 0.1},
+    'SQLite':    {'pages': 60000, 'rate': 40000, 'wss': 40000, 'hot': 0.2},
+    'OpenCV':    {'pages': 100000, 'rate': 12000, 'wss': 20000, 'hot': 0.3},
+    'YOLO':      {'pages': 150000, 'rate': 20000, 'wss': 30000, 'hot': 0.2},
+    'TinyLlama': {'pages': 140000, 'rate': 10000, 'wss': 25000, 'hot': 0.3},
+    '7zip':      {'pages': 80000, 'rate': 30000, 'wss': 30000, 'hot': 0.15},
+}
+HOT_SHARE = 0.8          # 热页吸收的写入比例
+BANDWIDTH = 30           # Flash 持续写入带宽 (MB/s)
+
+
+def _dirtied(t, size, rate):
+    """时长 t 内 rate 次/s 的写入均匀落在 size 个页面上，被写脏的不同页面数"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = size * -np.expm1(-rate * t / size)
+    return np.where(size > 0, out, 0.0)
+
+
+def simulate(pages, rate, wss, hot, bandwidth, system, hot_share=HOT_SHARE):
+    """参数可为标量或可广播的数组 (bandwidth 单位为 MB/s)，返回 dict:
+      rounds      在线阶段每轮传输的页数，形状 (配置数, 最大轮数)，未进行的轮为 0
+      n_rounds    在线轮数
+      downtime    停机时间 (s)
+      postcopy    后拷贝传输的页数
+      total       总时间 (s)
+      transferred 总传输页数
+    """
+    policy = POLICIES[system]
+    pages, rate, wss, hot, bandwidth, hot_share = (
+        a.ravel() for a in np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+            pages, rate, wss, hot, bandwidth, hot_share))))
+    bw = bandwidth * MB
+    live_bw = bw * (1 - policy['overhead'])
+    w_hot, w_warm = wss * hot, wss * (1 - hot)
+    r_hot, r_warm = rate * hot_share, rate * (1 - hot_share)
+    deferred = policy['accuracy'] * w_hot          # 识别出的热页: 在线阶段不传输
+    threshold = policy['threshold'] * DOWNTIME_TARGET * bw
+
+    def hot_window(t):
+        """热页从被发送到本轮结束的平均时长"""
+        return np.minimum(t, w_hot / live_bw) if policy['ordered'] else t
+
+    n = len(pages)
+    rounds = np.zeros((n, policy['rounds']))
+    sent = pages - deferred                         # 第 0 轮: 全部非零页
+    elapsed = np.zeros(n)
+    active = np.ones(n, dtype=bool)
+    last = np.zeros(n)                              # 最后一个在线轮的时长
+    n_rounds = np.zeros(n, dtype=np.int64)
+    for i in range(policy['rounds']):
+        t = np.where(active, sent / live_bw, 0.0)
+        rounds[:, i] = np.where(active, sent, 0.0)
+        elapsed += t
+        last = np.where(active, t, last)
+        n_rounds += active
+        # 本轮期间被写脏、需要在下一轮传输的页面 (已推迟的热页除外)
+        dirty = (_dirtied(t, w_warm, r_warm)
+                 + (1 - policy['accuracy']) * _dirtied(hot_window(t), w_hot, r_hot))
+        if policy['postcopy']:
+            done = np.zeros(n, dtype=bool)          # 只在热度模型收敛 (轮数用完) 时结束
+        else:
+            done = (dirty <= threshold) | (dirty >= PROGRESS * sent) & (i > 0)
+        active &= ~done
+        sent = np.where(active, dirty, sent)
+        if not active.any():
+            break
+
+    # 停机阶段: 最后一轮期间被写脏的页面 + 推迟的热页
+    hot_left = deferred + (1 - policy['accuracy']) * _dirtied(hot_window(last), w_hot, r_hot)
+    warm_left = _dirtied(last, w_warm, r_warm)
+    if policy['postcopy']:
+        stop, post = hot_left, warm_left
+    else:
+        stop, post = hot_left + warm_left, np.zeros(n)
+    downtime = stop / bw + STOP_COST
+    total = elapsed + downtime + post / bw
+    return {
+        'rounds': rounds,
+        'n_rounds': n_rounds,
+        'downtime': downtime,
+        'postcopy': post,
+        'total': total,
+        'transferred': rounds.sum(axis=1) + stop + post,
+    }
+
+
+def from_trace(path, cover=HOT_SHARE):
+    """由 dptrace 文件估计负载参数: 热页取覆盖 cover 比例写入的最少页面"""
+    n_pages = dptrace.header(path)['n_pages']
+    counts = np.zeros(n_pages, dtype=np.int64)
+    first = last = None
+    for t, p, _ in dptrace.chunks(path):
+        if len(t):
+            counts += np.bincount(p.astype(np.intp), minlength=n_pages)
+            first = int(t[0]) if first is None else first
+            last = int(t[-1])
+    touched = np.sort(counts[counts > 0])[::-1]
+    writes = touched.sum()
+    duration = max((last - first) / 1e9, 1e-9) if first is not None else 1.0
+    k = int(np.searchsorted(np.cumsum(touched), cover * writes)) + 1 if writes else 0
+    return {'pages': n_pages, 'rate': writes / duration, 'wss': len(touched),
+            'hot': k / max(len(touched), 1)}
+
+
+def workload_params(workloads=WORKLOADS):
+    """各负载的参数，有 trace 的负载改用 trace 估计值"""
+    params = {}
+    for name, default in workloads.items():
+        path = dptrace.find(name)
+        params[name] = from_trace(path) if path else default
+    return params
+
+
+def predict(params, bandwidth=BANDWIDTH, systems=SYSTEMS):
+    """{负载: 参数} -> {系统: simulate 结果}，负载按 params 的顺序排列"""
+    cols = {k: np.array([p[k] for p in params.values()]) for k in ('pages', 'rate', 'wss', 'hot')}
+    return {s: simulate(cols['pages'], cols['rate'], cols['wss'], cols['hot'], bandwidth, s)
+            for s in systems}
+
+
+def grid(**axes):
+    """what-if 网格: 每个参数一组取值，返回展开后的参数数组 (笛卡尔积)"""
+    mesh = np.meshgrid(*(np.asarray(v, dtype=float) for v in axes.values()), indexing='ij')
+    return {k: m.ravel() for k, m in zip(axes, mesh)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='快照/迁移时间模型的 what-if 扫描')
+    parser.add_argument('--bandwidth', type=float, nargs='+', default=[10, 20, 30, 50, 80, 120],
+                        help='带宽 (MB/s)')
+    parser.add_argument('--rate', type=float, nargs='+',
+                        default=np.geomspace(100, 100000, 13).round().tolist(), help='写入速率 (次/s)')
+    parser.add_argument('--wss', type=float, nargs='+',
+                        default=[1000, 2000, 5000, 10000, 20000, 40000, 80000], help='工作集页数')
+    parser.add_argument('--hot', type=float, nargs='+', default=[0.05, 0.1, 0.2, 0.3, 0.5])
+    parser.add_argument('--pages', type=float, nargs='+', default=[32768, 65536, 131072, 262144],
+                        help='非零页数')
+    parser.add_argument('-o', '--out', help='逐配置输出的 CSV')
+    args = parser.parse_args()
+
+    cfg = grid(pages=args.pages, rate=args.rate, wss=args.wss, hot=args.hot, bandwidth=args.bandwidth)
+    cfg['wss'] = np.minimum(cfg['wss'], cfg['pages'])
+    start = time.perf_counter()
+    res = {s: simulate(cfg['pages'], cfg['rate'], cfg['wss'], cfg['hot'], cfg['bandwidth'], s)
+           for s in SYSTEMS}
+    elapsed = time.perf_counter() - start
+    n = len(cfg['pages'])
+
+    downtime = np.stack([res[s]['downtime'] for s in SYSTEMS])
+    total = np.stack([res[s]['total'] for s in SYSTEMS])
+    print(f'{n} 种配置 × {len(SYSTEMS)} 个系统, 耗时 {elapsed:.3f}s')
+    print(f'{"系统":<12}{"停机中位数 (ms)":>16}{"停机 p99 (ms)":>15}{"总时间中位数 (s)":>17}'
+          f'{"平均轮数":>10}{"停机最短":>10}{"总时间最短":>12}')
+    best_dt, best_total = downtime.argmin(0), total.argmin(0)
+    for i, s in enumerate(SYSTEMS):
+        print(f'{s:<12}{np.median(downtime[i]) * 1e3:>16.0f}{np.percentile(downtime[i], 99) * 1e3:>15.0f}'
+              f'{np.median(total[i]):>17.1f}{res[s]["n_rounds"].mean():>10.1f}'
+              f'{np.mean(best_dt == i):>10.1%}{np.mean(best_total == i):>12.1%}')
+
+    if args.out:
+        with open(args.out, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(cfg) + [f'{s}_{m}' for s, m in itertools.product(
+                SYSTEMS, ('rounds', 'downtime', 'total'))])
+            columns = list(cfg.values()) + [res[s][m] for s, m in itertools.product(
+                SYSTEMS, ('n_rounds', 'downtime', 'total'))]
+            writer.writerows(zip(*columns))
+
+
+if __name__ == '__main__':
+    main()
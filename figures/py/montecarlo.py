@@ -0,0 +1,198 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import heatmap
+import numpy as np
+import ringbuf
+import spisim
+
+# --- 随机图的 Monte-Carlo 置信带 (ring / spi / drift) ---
+# 1. 种子: np.random.SeedSequence(seed).spawn(N) 得到 N 个互相独立的子序列，
+#    每个实现各自用 np.random.default_rng(子序列) 抽样，与进程数、分块方式无关
+# 2. 子序列按 BATCH 个一组分给进程池，每组在工作进程内抽样后在线归约 (ring 一组的实现
+#    用 ringbuf.simulate_batch 一起模拟)，只把归约结果 (Reducer) 传回主进程按组的顺序合并，
+#    原始实现从不全部留在内存里
+# 3. Reducer: 均值 / 方差按 Chan 的并行公式合并；分位数来自每个元素一个定宽直方图
+#    (BINS 桶，两端各一个溢出桶)，精度为一个桶宽。各元素的范围由第一组实现 (主进程先跑)
+#    逐元素的最小值 / 最大值向两侧各扩展三倍宽度给出 (STUDIES 中给定范围的除外)，
+#    桶宽随该元素实际的分布宽度缩放
+SEEDS = 1000
+SEED = 42
+BATCH = 25               # 每个作业的实现数
+BINS = 256
+BAND = (5, 25, 50, 75, 95)
+
+
+class Reducer:
+    """逐个实现的在线统计: 均值、方差，lo/hi 给出时还有分位数"""
+
+    def __init__(self, shape, lo=None, hi=None, bins=BINS):
+        """lo / hi 为标量或与单个实现形状相同的数组 (逐元素的直方图范围)"""
+        self.n = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.bins = bins
+        self.lo = self.hi = self.hist = None
+        if lo is not None:
+            self.lo = np.broadcast_to(np.asarray(lo, dtype=float), shape).ravel()
+            self.hi = np.broadcast_to(np.asarray(hi, dtype=float), shape).ravel()
+            self.hist = np.zeros((len(self.lo), bins + 2), dtype=np.int64)
+
+    def add(self, x):
+        x = np.asarray(x, dtype=float)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if self.hist is not None:
+            k = np.floor((x.ravel() - self.lo) / (self.hi - self.lo) * self.bins).astype(np.int64) + 1
+            self.hist[np.arange(len(k)), np.clip(k, 0, self.bins + 1)] += 1
+
+    def merge(self, other):
+        n = self.n + other.n
+        if n:
+            delta = other.mean - self.mean
+            self.mean = self.mean + delta * other.n / n
+            self.m2 = self.m2 + other.m2 + delta ** 2 * self.n * other.n / n
+        self.n = n
+        if self.hist is not None:
+            self.hist += other.hist
+        return self
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / max(self.n - 1, 1))
+
+    def quantile(self, q):
+        """第 q 百分位数 (桶内线性插值)，形状与单个实现相同"""
+        cdf = np.cumsum(self.hist, axis=1)
+        target = q / 100 * self.n
+        k = np.argmax(cdf >= target, axis=1)
+        before = np.where(k > 0, cdf[np.arange(len(k)), k - 1], 0)
+        count = self.hist[np.arange(len(k)), k]
+        frac = np.where(count > 0, (target - before) / np.maximum(count, 1), 0.0)
+        width = (self.hi - self.lo) / self.bins
+        value = self.lo + (k - 1 + frac) * width
+        return np.clip(value, self.lo, self.hi).reshape(self.mean.shape)
+
+
+# --- 各个随机图的抽样: [rng, ...] -> 逐个产出 {统计量: 数组} ---
+# 只调用无副作用的模拟模块 (ringbuf / spisim / heatmap)，不导入图脚本，rcParams 不受影响
+# 每项研究: (抽样函数, {需要分位数的统计量: (lo, hi)，None 表示由第一组实现定出}；
+# 其余统计量只统计均值与方差)
+def ring_sample(rngs):
+    """ring.py: 写合并前后的 I/O 提交频率"""
+    traces = [ringbuf.synthetic_trace(rng, duration=60.0, peak_rate=2800) for rng in rngs]
+    for res in ringbuf.simulate_batch(traces, capacity=4096, flush_interval=0.5, bin_size=0.5):
+        keep = res['time'] <= 60
+        yield {'time': res['time'][keep], 'logical_iops': res['logical_iops'][keep],
+               'physical_iops': res['physical_iops'][keep]}
+
+
+def spi_sample(rngs):
+    """spi.py: SPI 与三种策略的归一化尾延迟"""
+    t = np.arange(0, spisim.DURATION + 0.2, 0.2)
+    for rng in rngs:
+        noise = spisim.sample_noise(rng, len(t))
+        out = dict(zip(('spi', 'lat_aggressive', 'lat_conservative', 'lat_hpro'), spisim.simulate(t, noise)))
+        yield {'time': t, **out}
+
+
+def drift_sample(rngs):
+    """drift.py: 每个时刻的总写入强度与最热地址"""
+    for rng in rngs:
+        data = np.clip(heatmap.drift(rng), 0, 40)
+        yield {'intensity': data.sum(axis=0), 'peak': data.argmax(axis=0)}
+
+
+STUDIES = {
+    'ring': (ring_sample, {'logical_iops': None, 'physical_iops': None}),
+    'spi': (spi_sample, {'spi': None, 'lat_aggressive': None, 'lat_conservative': None, 'lat_hpro': None}),
+    # 最热地址是整数下标，在几个热点之间跳变，第一组定不出范围；按地址空间分桶已细于 1
+    'drift': (drift_sample, {'intensity': None, 'peak': (0, 200)}),
+}
+
+
+def _ranges(study, outs):
+    """{统计量: (lo, hi)}: 未指定范围的统计量取逐元素的最小 / 最大值，向两侧各扩展三倍宽度，
+    尾部较重的元素也很少落到溢出桶；第一组里几乎不变的元素至少按该统计量各元素宽度中位数的
+    1/10 扩展"""
+    ranges = {}
+    for k, fixed in STUDIES[study][1].items():
+        if fixed is not None:
+            ranges[k] = fixed
+            continue
+        x = np.array([out[k] for out in outs], dtype=float)
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        pad = 3 * np.maximum(hi - lo, max(0.1 * np.median(hi - lo), 1e-6 * np.abs(x).max(), 1e-12))
+        ranges[k] = (lo - pad, hi + pad)
+    return ranges
+
+
+def _reduce(outs, ranges):
+    reducers = None
+    for out in outs:
+        if reducers is None:
+            reducers = {k: Reducer(np.shape(out[k]), *ranges.get(k, (None, None))) for k in out}
+        for k, r in reducers.items():
+            r.add(out[k])
+    return reducers
+
+
+def _run_batch(study, seeds, ranges):
+    sample = STUDIES[study][0]
+    return _reduce(sample([np.random.default_rng(seq) for seq in seeds]), ranges)
+
+
+def run(study, seeds=SEEDS, seed=SEED, workers=None, batch=BATCH):
+    """study 的 seeds 个独立实现，返回 {统计量: Reducer}"""
+    children = np.random.SeedSequence(seed).spawn(seeds)
+    jobs = [children[i:i + batch] for i in range(0, seeds, batch)]
+    # 第一组在主进程里先跑，定出各元素直方图的范围，其余各组沿用
+    first = list(STUDIES[study][0]([np.random.default_rng(seq) for seq in jobs[0]]))
+    ranges = _ranges(study, first)
+    total = _reduce(first, ranges)
+    if len(jobs) == 1:
+        return total
+    workers = workers or min(len(jobs) - 1, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 按组的顺序合并，结果与进程数无关
+        for part in pool.map(_run_batch, [study] * (len(jobs) - 1), jobs[1:], [ranges] * (len(jobs) - 1)):
+            for k in total:
+                total[k].merge(part[k])
+    return total
+
+
+def bands(reducer, band=BAND):
+    """{百分位: 数组}，用于画中位数与百分位带"""
+    return {q: reducer.quantile(q) for q in band}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='随机图的 Monte-Carlo 置信带')
+    parser.add_argument('studies', nargs='*', default=list(STUDIES), help=f'{"/".join(STUDIES)}')
+    parser.add_argument('-n', '--seeds', type=int, default=SEEDS, help='实现数')
+    parser.add_argument('--seed', type=int, default=SEED, help='根种子')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    args = parser.parse_args()
+    unknown = set(args.studies) - set(STUDIES)
+    if unknown:
+        parser.error(f'未知的研究: {", ".join(sorted(unknown))}')
+
+    for study in args.studies:
+        start = time.perf_counter()
+        res = run(study, args.seeds, args.seed, args.jobs)
+        elapsed = time.perf_counter() - start
+        print(f'{study}: {args.seeds} 个实现，耗时 {elapsed:.2f}s')
+        for k, r in res.items():
+            if r.hist is None:
+                continue
+            med, lo, hi = r.quantile(50), r.quantile(5), r.quantile(95)
+            print(f'  {k:<18} 中位数均值 {med.mean():10.3f}  90% 带平均宽度 {(hi - lo).mean():10.3f}'
+                  f'  标准差均值 {r.std.mean():10.3f}')
+
+
+if __name__ == '__main__':
+    main()
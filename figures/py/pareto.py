@@ -0,0 +1,61 @@
+import batch
+import matplotlib.pyplot as plt
+import numpy as np
+import scancost
+import style
+
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
+
+
+def plot_sampling_pareto():
+    # --- 2. 数据准备 (scancost.py 在本机实测的扫描开销与识别准确率) ---
+    res = scancost.sweep()
+
+    # --- 3. 绘图: 每个客户机大小一条曲线 (按扫描间隔连接)，Pareto 前沿上的点填充 ---
+    fig, ax = plt.subplots(figsize=(8, 5))
+    colors = ['#2ca02c', '#1f77b4', '#ff7f0e', '#d62728']
+    markers = ['o', 's', '^', 'D']
+    for i, (size, rows) in enumerate(res.items()):
+        overhead = np.array([r['overhead'] for r in rows])
+        acc = np.array([r['accuracy'] for r in rows])
+        color = colors[i % len(colors)]
+        ax.plot(overhead, acc, '-', color=color, linewidth=1.2, alpha=0.6)
+        ax.scatter(overhead, acc, marker=markers[i % len(markers)], facecolor='white',
+                   edgecolor=color, linewidth=1.2, s=40, zorder=3)
+        front = scancost.pareto(rows)
+        ax.scatter(overhead[front], acc[front], marker=markers[i % len(markers)], color=color, s=40,
+                   zorder=4, label=f'{size:g}GB')
+
+        # 推荐间隔: 开销预算内准确率最高
+        best = scancost.recommend(rows)
+        ax.annotate(f'{best["interval"] * 1e3:g}ms', xy=(best['overhead'], best['accuracy']),
+                    xytext=(6, 6), textcoords='offset points', color=color, fontsize=10)
+
+    # 间隔标注 (各客户机大小的准确率相同，只标在最小的客户机上)
+    rows = next(iter(res.values()))
+    for r in rows:
+        ax.annotate(f'{r["interval"] * 1e3:g}', xy=(r['overhead'], r['accuracy']),
+                    xytext=(-6, -14), textcoords='offset points', color='dimgray', fontsize=9,
+                    ha='right')
+
+    # --- 4. 开销预算 ---
+    ax.axvline(scancost.BUDGET, color='red', linestyle='--', linewidth=1.5, alpha=0.7)
+    ax.text(scancost.BUDGET * 1.1, 5, f'开销预算 {scancost.BUDGET:g}%', color='red', fontsize=10)
+
+    # --- 5. 轴标签与图例 ---
+    ax.set_xscale('log')
+    ax.set_xlabel('扫描 CPU 开销 (%)', fontsize=16)
+    ax.set_ylabel('热点识别准确率 (%)', fontsize=16)
+    ax.set_ylim(0, 100)
+    ax.grid(True, linestyle='--', alpha=0.3)
+    ax.legend(loc='upper right', prop=style.font(size=12), frameon=True, edgecolor='black',
+              fancybox=False, title='客户机内存', title_fontproperties=style.font(size=12))
+
+    plt.tight_layout()
+    plt.savefig('pareto.pdf', format='pdf', bbox_inches='tight')
+    batch.show(fig)
+
+
+if __name__ == "__main__":
+    plot_sampling_pareto()
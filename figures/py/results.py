@@ -0,0 +1,177 @@
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+# --- 实验结果库 ---
+# 按列存放的 .npy 文件 (可 mmap 按需读取) + 一个 schema.json:
+#   workload / system / metric  -> uint16 编码，字典在 schema.json 中
+#   run                         -> 重复实验编号
+#   step                        -> 序列下标 (采样次数、直方图分桶、负载比例等)，标量结果为 0
+#   value                       -> 测量值，单位见 schema.json 的 units
+# 新的测量结果用 python results.py import xxx.csv 追加，不需要改绘图脚本
+STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SCHEMA = os.path.join(STORE, 'schema.json')
+
+COLUMNS = {
+    'workload': np.uint16,
+    'system': np.uint16,
+    'metric': np.uint16,
+    'run': np.uint32,
+    'step': np.int32,
+    'value': np.float64,
+}
+CATEGORICAL = ('workload', 'system', 'metric')
+
+# 图中显示用的标签
+LABELS = {'Idle': '空闲'}
+
+
+def label(workload):
+    return LABELS.get(workload, workload)
+
+
+# --- 1. 读取 ---
+def load_schema():
+    with open(SCHEMA, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def column(name):
+    """以只读 mmap 方式打开一列，只有真正访问到的页才会从磁盘读入"""
+    return np.load(os.path.join(STORE, name + '.npy'), mmap_mode='r')
+
+
+def _rows(schema, metric):
+    codes = schema['metric']
+    if metric not in codes:
+        raise KeyError(f'结果库中没有指标: {metric}')
+    return np.flatnonzero(column('metric') == codes.index(metric))
+
+
+def _positions(schema, name, wanted, rows):
+    """把某个分类列在 rows 上的编码映射为 wanted 中的下标，不在 wanted 中的为 -1"""
+    lookup = np.full(len(schema[name]), -1, dtype=np.intp)
+    for i, item in enumerate(wanted):
+        if item in schema[name]:
+            lookup[schema[name].index(item)] = i
+    return lookup[column(name)[rows]]
+
+
+def stats(metric, systems, workloads, step=0):
+    """返回 (mean, std, n)，形状均为 (len(systems), len(workloads))；缺失的组合为 NaN"""
+    schema = load_schema()
+    rows = _rows(schema, metric)
+    rows = rows[column('step')[rows] == step]
+
+    s = _positions(schema, 'system', systems, rows)
+    w = _positions(schema, 'workload', workloads, rows)
+    keep = (s >= 0) & (w >= 0)
+    flat = s[keep] * len(workloads) + w[keep]
+    values = np.asarray(column('value')[rows])[keep]
+
+    size = len(systems) * len(workloads)
+    n = np.bincount(flat, minlength=size)
+    total = np.bincount(flat, weights=values, minlength=size)
+    total_sq = np.bincount(flat, weights=values * values, minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / n
+        var = np.maximum(total_sq / n - mean * mean, 0.0)
+        std = np.sqrt(var * n / np.maximum(n - 1, 1))
+    shape = (len(systems), len(workloads))
+    return mean.reshape(shape), std.reshape(shape), n.reshape(shape)
+
+
+def series(metric, workload, system):
+    """返回 (steps, mean)：某个 workload/system 的序列，多次重复实验取平均"""
+    schema = load_schema()
+    rows = _rows(schema, metric)
+    s = _positions(schema, 'system', [system], rows)
+    w = _positions(schema, 'workload', [workload], rows)
+    rows = rows[(s == 0) & (w == 0)]
+
+    steps = np.asarray(column('step')[rows])
+    values = np.asarray(column('value')[rows])
+    uniq, inverse = np.unique(steps, return_inverse=True)
+    mean = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    return uniq, mean
+
+
+def unit(metric):
+    return load_schema()['units'].get(metric, '')
+
+
+# --- 2. 写入 ---
+def append(records, units=None):
+    """追加记录。records 为 {列名: 序列}，分类列直接给字符串"""
+    try:
+        schema = load_schema()
+        old = {name: np.load(os.path.join(STORE, name + '.npy')) for name in COLUMNS}
+    except OSError:
+        schema = {name: [] for name in CATEGORICAL}
+        schema['units'] = {}
+        old = {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+
+    n = len(records['value'])
+    new = {}
+    for name, dtype in COLUMNS.items():
+        values = records.get(name, [0] * n)
+        if name in CATEGORICAL:
+            codes = schema[name]
+            for item in values:
+                if item not in codes:
+                    codes.append(item)
+            values = [codes.index(item) for item in values]
+        new[name] = np.concatenate([old[name], np.asarray(values, dtype=dtype)])
+
+    schema['units'].update(units or {})
+    schema['columns'] = {name: np.dtype(dtype).name for name, dtype in COLUMNS.items()}
+
+    os.makedirs(STORE, exist_ok=True)
+    for name, values in new.items():
+        np.save(os.path.join(STORE, name + '.npy'), values)
+    with open(SCHEMA, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+def import_csv(path):
+    """导入 CSV，表头: workload,system,metric,run,step,value,unit (run/step/unit 可省略)"""
+    records = {name: [] for name in COLUMNS}
+    units = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            for name in CATEGORICAL:
+                records[name].append(row[name])
+            records['run'].append(int(row.get('run') or 0))
+            records['step'].append(int(row.get('step') or 0))
+            records['value'].append(float(row['value']))
+            if row.get('unit'):
+                units[row['metric']] = row['unit']
+    append(records, units)
+    return len(records['value'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='实验结果库')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_import = sub.add_parser('import', help='从 CSV 追加测量结果')
+    p_import.add_argument('csv', nargs='+')
+    sub.add_parser('show', help='列出库中的指标')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        for path in args.csv:
+            print(f'{path}: 导入 {import_csv(path)} 条记录')
+    else:
+        schema = load_schema()
+        metric = column('metric')
+        counts = np.bincount(metric, minlength=len(schema['metric']))
+        for code, name in enumerate(schema['metric']):
+            print(f'{name:<20} {counts[code]:>8} 条  单位: {schema["units"].get(name, "")}')
+
+
+if __name__ == '__main__':
+    main()
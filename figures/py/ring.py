@@ -1,59 +1,27 @@
+import batch
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as font_manager
-import numpy as np
+import ringbuf
+import seeding
+import style
 
-# --- 1. 字体与风格设置 ---
-plt.rcParams['font.sans-serif'] = ['SimHei', 'SimSun', 'Arial Unicode MS'] 
-plt.rcParams['axes.unicode_minus'] = False
-plt.rcParams['font.size'] = 14
-plt.rcParams['axes.linewidth'] = 1.5
-plt.rcParams['axes.unicode_minus'] = False
-plt.rcParams['xtick.direction'] = 'in'
-plt.rcParams['ytick.direction'] = 'in'
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
 
 def plot_write_coalescing_real():
-    # --- 2. 数据模拟 (模拟真实采样) ---
-    # 采样间隔 0.5s，共 60s -> 120个采样点
-    t = np.arange(0, 60.5, 0.5)
-    
-    # 基础负载形状 (梯形，模拟 Benchmark 预热->稳定->结束)
-    # 10s-50s 为高负载区
-    base_load = np.zeros_like(t)
-    for i, time in enumerate(t):
-        if 10 <= time <= 50:
-            base_load[i] = 1.0
-        elif 5 < time < 10:
-            base_load[i] = (time - 5) / 5 # 爬升
-        elif 50 < time < 55:
-            base_load[i] = 1.0 - (time - 50) / 5 # 下降
-            
-    # --- 生成 QEMU 数据 (真实特征：高频抖动 + 随机尖峰) ---
-    np.random.seed(42)
-    # 基准 IOPS ~ 2800
-    qemu_base = 2800 * base_load
-    # 添加白噪声 (White Noise)
-    qemu_noise = np.random.normal(0, 200, size=len(t))
-    # 添加突发尖峰 (Spikes - 模拟 Flash GC 造成的卡顿/突发)
-    qemu_spikes = np.random.choice([0, -800, 600], size=len(t), p=[0.85, 0.1, 0.05])
-    
-    iops_qemu = qemu_base + qemu_noise + qemu_spikes
-    # 底噪
-    iops_qemu += np.random.normal(50, 10, size=len(t))
-    iops_qemu = np.maximum(iops_qemu, 0) # 不小于0
-
-    # --- 生成 HPRO 数据 (真实特征：低位运行 + 周期性 Flush) ---
-    # 目标：平均降低 ~78%，即保留 ~22% (约 600 IOPS)
-    hpro_base = 600 * base_load
-    # 添加较小的抖动 (Buffer 吸收了大部分波动)
-    hpro_noise = np.random.normal(0, 50, size=len(t))
-    # 添加周期性 Flush 锯齿 (模拟缓冲区满落盘)
-    # 模拟每 4s 一次小高峰
-    hpro_sawtooth = 100 * np.sin(2 * np.pi * t / 4) * base_load
-    
-    iops_hpro = hpro_base + hpro_noise + hpro_sawtooth
-    # 底噪
-    iops_hpro += np.random.normal(20, 5, size=len(t))
-    iops_hpro = np.maximum(iops_hpro, 0)
+    # --- 2. 数据模拟 (ringbuf.py 写合并模拟器) ---
+    # SQLite 类写入序列: 5s-10s 爬升，10s-50s 为高负载区 (~2800 次写入/s)，50s-55s 下降
+    rng = seeding.generator()
+    ts, pages = ringbuf.synthetic_trace(rng, duration=60.0, peak_rate=2800)
+
+    # 采样间隔 0.5s，共 60s；QEMU 不做合并，每次逻辑写入即一次物理 I/O
+    res = ringbuf.simulate(ts, pages, capacity=4096, flush_interval=0.5, bin_size=0.5)
+    keep = res['time'] <= 60
+    t = res['time'][keep]
+    iops_qemu = res['logical_iops'][keep]
+    iops_hpro = res['physical_iops'][keep]
+    active = (t >= 10) & (t < 50)  # SQLite 活跃窗口
+    print(f"合并比 {res['merge_ratio']:.2f}, 活跃窗口物理 I/O 降低 "
+          f"{1 - iops_hpro[active].mean() / iops_qemu[active].mean():.0%}")
 
     # --- 3. 绘图 ---
     fig, ax = plt.subplots(figsize=(8, 5))
@@ -68,19 +36,6 @@ def plot_write_coalescing_real():
             label='HPRO')
 
     # --- 4. 标注与细节 ---
-    # 选择一个典型时刻标注差距 (例如 t=32s)
-    idx = 64 # 32s 对应的索引 (32 / 0.5)
-    val_q = iops_qemu[idx]
-    val_h = iops_hpro[idx]
-    
-    # 画箭头
-#     ax.annotate('', xy=(32, val_h), xytext=(32, val_q),
-#                 arrowprops=dict(arrowstyle='<->', color='black', lw=1.5))
-    
-    # 文字说明
-#     ax.text(33.5, (val_q + val_h)/2, '峰值降低 ~78%', 
-#             color='black', fontsize=12, fontweight='bold', va='center')
-
     # 标注活跃区间背景
     ax.axvspan(10, 50, color='gray', alpha=0.1)
     ax.text(30, 3600, 'SQLite 活跃窗口', ha='center', fontsize=12, color='dimgray')
@@ -97,12 +52,12 @@ def plot_write_coalescing_real():
     ax.set_axisbelow(True)
 
     # 图例
-    font_prop = font_manager.FontProperties(family=['SimHei', 'SimSun'], size=12)
+    font_prop = style.font(size=12)
     ax.legend(loc='upper right', prop=font_prop, frameon=True, edgecolor='black', fancybox=False)
 
     plt.tight_layout()
     plt.savefig('ring.pdf', format='pdf', bbox_inches='tight')
-    plt.show()
+    batch.show(fig)
 
 if __name__ == "__main__":
     plot_write_coalescing_real()
\ No newline at end of file
@@ -1,16 +1,267 @@
+import argparse
+import glob
+import hashlib
+import json
 import os
-import subprocess
+import re
+import runpy
 import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from importlib import metadata
 
-def run_all_py_files():
-    current_file = os.path.basename(__file__)
-    current_dir = os.path.dirname(os.path.abspath(__file__))
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(HERE, '.figcache.json')
+
+# 实验结果库 (见 results.py) 的全部文件
+RESULTS = ['results/schema.json'] + [f'results/{c}.npy' for c in
+                                     ('workload', 'system', 'metric', 'run', 'step', 'value')]
+
+# 各负载的脏页 trace (见 dptrace.py)，存在时 zipf.py 直接从中统计
+TRACES = sorted(os.path.relpath(p, HERE) for p in glob.glob(os.path.join(HERE, 'traces', '*.dpt')))
+
+# drift.py 设置 DRIFT_TRACE 时改由该 trace 统计热度 (见 drift.py)，trace 文件也是它的输入
+DRIFT_TRACE = [os.environ['DRIFT_TRACE']] if os.environ.get('DRIFT_TRACE') else []
+
+# 会改变图内容的环境变量，计入缓存键
+#   FIG_LEGACY_RNG  兼容模式 (见 seeding.py)，改变随机图的结果
+#   DRIFT_TRACE     drift.py 的数据来源
+#   CONT_MODEL      cont.py 改用 dynbatch.py 的模拟结果 (见 cont.py)
+ENV = ['FIG_LEGACY_RNG', 'DRIFT_TRACE', 'CONT_MODEL']
+
+# --- 1. 作业表 ---
+# 脚本 -> (产物文件, 依赖的输入文件)
+# 某个脚本的输入若是另一个脚本的产物，则自动排在其后执行
+JOBS = {
+    'acc.py':   (['acc.pdf'], RESULTS),
+    'bands.py': (['ring_mc.pdf', 'spi_mc.pdf', 'drift_mc.pdf'], []),
+    'cont.py':  (['cont.pdf'], RESULTS + TRACES),
+    'drift.py': (['drift.pdf'], DRIFT_TRACE),
+    'dt3b.py':  (['dt3b.pdf'], RESULTS),
+    'dt4b.py':  (['dt4b.pdf'], RESULTS),
+    'du3b.py':  (['du3b.pdf'], RESULTS),
+    'du4b.py':  (['du4b.pdf'], RESULTS),
+    'gran.py':  (['gran.pdf'], RESULTS),
+    'mig.py':   (['mig_dt.pdf', 'mig_du.pdf'], TRACES),
+    'pareto.py': (['pareto.pdf'], []),
+    'pl3b.py':  (['pl3b.pdf'], RESULTS),
+    'pl4b.py':  (['pl4b.pdf'], RESULTS),
+    'ring.py':  (['ring.pdf'], []),
+    'shift.py': (['shift.pdf'], RESULTS),
+    'spi.py':   (['spi.pdf', 'spi_latency_sampled_data.csv'], []),
+    'zipf.py':  (['zipf.pdf'], RESULTS + TRACES),
+}
+
+
+def build_graph(jobs):
+    """根据输入/输出文件推导依赖关系: 返回 {脚本: 需要先完成的脚本集合}"""
+    producer = {}
+    for script, (outputs, _) in jobs.items():
+        for out in outputs:
+            producer[out] = script
+
+    deps = {}
+    for script, (_, inputs) in jobs.items():
+        deps[script] = {producer[f] for f in inputs if f in producer and producer[f] != script}
+    return deps
+
+
+# --- 2. 增量缓存 ---
+# 缓存键 = 脚本源码 + 它导入的本地模块 (如共享样式) + 输入数据 + matplotlib/numpy 版本
+_IMPORT_RE = re.compile(r'^\s*(?:from|import)\s+(\w+)', re.MULTILINE)
+
+
+def _local_sources(script):
+    """脚本及其递归导入的本目录模块"""
+    seen, stack = [], [script]
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.append(name)
+        with open(os.path.join(HERE, name), encoding='utf-8') as f:
+            source = f.read()
+        for module in _IMPORT_RE.findall(source):
+            if os.path.exists(os.path.join(HERE, module + '.py')):
+                stack.append(module + '.py')
+    return sorted(seen)
+
+
+def _versions():
+    versions = []
+    for package in ('matplotlib', 'numpy'):
+        try:
+            versions.append(f'{package}=={metadata.version(package)}')
+        except metadata.PackageNotFoundError:
+            versions.append(f'{package}==?')
+    return versions
+
+
+def cache_key(script, inputs, versions):
+    h = hashlib.sha256()
+    for line in versions:
+        h.update(line.encode())
+    for name in _local_sources(script) + sorted(inputs):
+        h.update(name.encode())
+        path = os.path.join(HERE, name)
+        if name.endswith('.dpt') and os.path.exists(path):
+            # trace 动辄数 GB，只看大小和修改时间
+            st = os.stat(path)
+            h.update(f'{st.st_size}:{st.st_mtime_ns}'.encode())
+        elif os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    # 清理已经不在作业表里的条目
+    cache = {s: e for s, e in cache.items() if s in JOBS}
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def is_fresh(cache, script, key):
+    entry = cache.get(script)
+    if entry is None or entry['key'] != key:
+        return False
+    return all(os.path.exists(os.path.join(HERE, out)) for out in entry['outputs'])
+
+
+# --- 3. 工作进程 ---
+# 每个进程只导入一次 numpy / matplotlib，然后依次渲染分配到的多张图
+def _init_worker():
+    # 构建时默认进入批处理模式 (见 batch.py)
+    os.environ.setdefault('FIG_BATCH', '1')
+    os.environ['MPLBACKEND'] = 'Agg'
+    os.chdir(HERE)
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+    import numpy  # noqa: F401
+    import batch  # noqa: F401
+    import matplotlib.pyplot  # noqa: F401
+
+
+def _render(script):
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    # 上一张图的 rcParams 不能带到下一张图
+    matplotlib.rcdefaults()
+    try:
+        runpy.run_path(os.path.join(HERE, script), run_name='__main__')
+        error = None
+    except BaseException:
+        error = traceback.format_exc()
+    finally:
+        plt.close('all')
+    return script, time.perf_counter() - start, error
+
+
+# --- 4. 调度器 ---
+def run_jobs(jobs, max_workers=None, force=False):
+    """按依赖图把脚本分发到进程池，返回失败的脚本列表"""
+    deps = build_graph(jobs)
+    pending = dict(deps)
+    done, failed = set(), []
+    max_workers = max_workers or min(os.cpu_count() or 1, len(jobs)) or 1
+    cache = load_cache()
+    versions = _versions() + [f'{name}={os.environ.get(name, "")}' for name in ENV]
+
+    # 进程池按需创建: 全部命中缓存时不必启动任何工作进程
+    pool = None
+    running, keys = {}, {}
+    try:
+        while pending or running:
+            # 依赖失败的脚本直接跳过
+            for script in [s for s, d in pending.items() if d & set(failed)]:
+                print(f'Skipped: {script} (依赖失败)')
+                failed.append(script)
+                del pending[script]
+
+            ready = [s for s, d in pending.items() if d <= done]
+            for script in ready:
+                del pending[script]
+                # 依赖已完成后再计算缓存键，上游重新生成的数据会让下游失效
+                inputs = jobs[script][1]
+                keys[script] = cache_key(script, inputs, versions)
+                if not force and is_fresh(cache, script, keys[script]):
+                    print(f'Cached:  {script}')
+                    done.add(script)
+                    continue
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+                print(f'Running: {script}')
+                running[pool.submit(_render, script)] = script
+
+            if not running:
+                if ready:
+                    continue
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                del running[future]
+                script, elapsed, error = future.result()
+                if error is None:
+                    print(f'Done:    {script} ({elapsed:.2f}s)')
+                    done.add(script)
+                    cache[script] = {'key': keys[script], 'outputs': jobs[script][0]}
+                else:
+                    print(f'Failed:  {script}\n{error}')
+                    failed.append(script)
+                    cache.pop(script, None)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        save_cache(cache)
+
+    return failed
+
+
+def run_all_py_files(targets=None, max_workers=None, force=False):
+    jobs = JOBS
+    if targets:
+        # 只构建指定的图，但要带上它们依赖的脚本
+        deps = build_graph(JOBS)
+        selected, stack = set(), list(targets)
+        while stack:
+            script = stack.pop()
+            if script not in selected:
+                selected.add(script)
+                stack.extend(deps[script])
+        jobs = {s: JOBS[s] for s in JOBS if s in selected}
+
+    start = time.perf_counter()
+    failed = run_jobs(jobs, max_workers, force)
+    print(f'Total: {len(jobs)} scripts, {len(failed)} failed, {time.perf_counter() - start:.2f}s')
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行构建 figures/py 下的所有图')
+    parser.add_argument('targets', nargs='*', help='只构建指定的脚本 (例如 spi.py)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='工作进程数 (默认等于 CPU 核数)')
+    parser.add_argument('-f', '--force', action='store_true', help='忽略缓存，全部重新生成')
+    args = parser.parse_args()
+
+    unknown = [t for t in args.targets if t not in JOBS]
+    if unknown:
+        parser.error(f'未知的脚本: {", ".join(unknown)}')
+
+    failed = run_all_py_files(args.targets, args.jobs, args.force)
+    sys.exit(1 if failed else 0)
 
-    for file in os.listdir(current_dir):
-        if file.endswith('.py') and file != current_file:
-            file_path = os.path.join(current_dir, file)
-            print(f'Running: {file}')
-            subprocess.run([sys.executable, file_path])
 
 if __name__ == '__main__':
-    run_all_py_files()
+    main()
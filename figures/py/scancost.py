@@ -0,0 +1,143 @@
+import argparse
+import time
+
+import aging
+import numpy as np
+
+# --- 脏位采样的代价模型: 扫描间隔 vs CPU 开销与热点识别准确率 (hotspot.tex 的 "采样悖论") ---
+# 1. 脏页位图与 KVM 的 dirty log 一致: uint64 字数组，第 w 个字的第 i 位对应页面 64w + i
+# 2. 一次扫描 = 读出并清零位图 (拷贝后整体置零)，按字 popcount 统计脏页数，
+#    np.unpackbits 展开后交给 aging.Aging 更新并给出极热页集合；只对这一段计 CPU 时间，
+#    生成写入的部分不计入
+# 3. 写入模型: 页面按写入速率分为极热 / 温热 / 冷寂三类，间隔 τ 内被写脏的概率为 1 - exp(-λτ)；
+#    真实热点集合 = 极热类页面，准确率 = 检测出的极热页集合与之的 Jaccard 相似度 (%)
+#    间隔太短，极热页在某个周期里恰好没被写入的概率变大 (漏检)；间隔太长，温热页也会
+#    连续若干周期都被写脏 (误检)。开销 = 单次扫描 CPU 时间 / 间隔，随客户机内存线性增长
+# 4. 同一客户机大小下，开销与准确率的非支配点构成 Pareto 前沿；在开销预算 BUDGET 内
+#    取准确率最高的间隔作为推荐值
+PAGE = 4096
+GB = 2**30 // PAGE       # 每 GB 的页数
+SIZES = [1, 2, 4, 8]     # 客户机内存 (GB)
+INTERVALS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0]
+CLASSES = {'hot': (0.01, 20.0), 'warm': (0.05, 1.0)}    # 各类页面: (占全部页面的比例, 写入速率 次/s)
+SCANS = 30               # 计入统计的扫描次数
+WARMUP = aging.MAX_BITS  # 老化状态填满之前的扫描不计入准确率
+BUDGET = 1.0             # CPU 开销预算 (%)
+
+
+class DirtyLog:
+    """uint64 字组成的脏页位图"""
+
+    def __init__(self, n_pages):
+        self.n_pages = n_pages
+        self.words = np.zeros(-(-n_pages // 64), dtype=np.uint64)
+
+    def mark(self, dirty):
+        """写入: dirty 为长度不超过 n_pages 的 bool 数组 (从第 0 页开始)"""
+        bits = np.packbits(dirty, bitorder='little')
+        view = self.words.view(np.uint8)
+        view[:len(bits)] |= bits
+
+    def scan(self):
+        """读出并清零，返回 (每页一个 0/1 字节的数组, 脏页数)"""
+        words = self.words.copy()
+        self.words[:] = 0
+        count = int(np.bitwise_count(words).sum())
+        return np.unpackbits(words.view(np.uint8), count=self.n_pages, bitorder='little'), count
+
+
+def _layout(n_pages, classes=CLASSES):
+    """各类页面依次排在低地址: 返回 (每页的写入速率, 真实极热集合)"""
+    sizes = [int(n_pages * share) for share, _ in classes.values()]
+    rates = np.repeat([rate for _, rate in classes.values()], sizes)
+    truth = np.zeros(n_pages, dtype=bool)
+    truth[:sizes[0]] = True
+    return rates, truth
+
+
+def measure(n_pages, interval, scans=SCANS, classes=CLASSES, seed=0):
+    """以间隔 interval 扫描 n_pages 个页面的位图，返回 dict:
+      cost        单次扫描 (读清 + 老化 + 决策) 的 CPU 时间中位数 (s)
+      throughput  页/s
+      overhead    CPU 开销 (%) = cost / interval
+      accuracy    极热集合的平均识别准确率 (%)
+      dirty       每次扫描的平均脏页数
+    """
+    rng = np.random.default_rng(seed)
+    rates, truth = _layout(n_pages, classes)
+    p = -np.expm1(-rates * interval)
+    log, state = DirtyLog(n_pages), aging.Aging(n_pages)
+    cost, acc, dirty = [], [], []
+    for i in range(WARMUP + scans):
+        log.mark(rng.random(len(p)) < p)
+        start = time.process_time_ns()
+        bits, count = log.scan()
+        state.step(bits.view(np.bool_))
+        detected = state.hot()
+        cost.append(time.process_time_ns() - start)
+        if i >= WARMUP:
+            acc.append(aging.accuracy(detected, truth))
+            dirty.append(count)
+    cost = float(np.median(cost[WARMUP:])) / 1e9
+    return {
+        'cost': cost,
+        'throughput': n_pages / cost if cost else float('inf'),
+        'overhead': 100.0 * cost / interval,
+        'accuracy': float(np.mean(acc)),
+        'dirty': float(np.mean(dirty)),
+    }
+
+
+def sweep(sizes=SIZES, intervals=INTERVALS, scans=SCANS, seed=0):
+    """{客户机大小 (GB): [每个间隔的 measure 结果 (附 interval)]}
+
+    计时敏感，在当前进程中依次测量，不放进进程池
+    """
+    return {size: [{'interval': t, **measure(int(size * GB), t, scans, seed=seed)} for t in intervals]
+            for size in sizes}
+
+
+def pareto(rows):
+    """开销更低且准确率不更差的点都不存在的那些行，按开销升序"""
+    order = sorted(range(len(rows)), key=lambda i: (rows[i]['overhead'], -rows[i]['accuracy']))
+    front, best = [], -np.inf
+    for i in order:
+        if rows[i]['accuracy'] > best:
+            front.append(i)
+            best = rows[i]['accuracy']
+    return front
+
+
+def recommend(rows, budget=BUDGET):
+    """开销不超过 budget 的间隔中准确率最高的一行；都超出预算时取开销最低的一行"""
+    within = [r for r in rows if r['overhead'] <= budget]
+    if within:
+        return max(within, key=lambda r: r['accuracy'])
+    return min(rows, key=lambda r: r['overhead'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='脏位采样代价: 扫描间隔 vs CPU 开销与准确率')
+    parser.add_argument('--sizes', type=float, nargs='+', default=SIZES, help='客户机内存 (GB)')
+    parser.add_argument('--intervals', type=float, nargs='+', default=INTERVALS, help='扫描间隔 (s)')
+    parser.add_argument('--scans', type=int, default=SCANS, help='每个配置计入统计的扫描次数')
+    parser.add_argument('--budget', type=float, default=BUDGET, help='CPU 开销预算 (%%)')
+    args = parser.parse_args()
+
+    res = sweep(args.sizes, args.intervals, args.scans)
+    print(f'{"内存 (GB)":>9}{"间隔 (ms)":>10}{"单次 (ms)":>10}{"吞吐 (M页/s)":>14}'
+          f'{"开销 (%)":>10}{"准确率 (%)":>12}  Pareto')
+    for size, rows in res.items():
+        front = set(pareto(rows))
+        for i, r in enumerate(rows):
+            print(f'{size:>9g}{r["interval"] * 1e3:>10g}{r["cost"] * 1e3:>10.2f}'
+                  f'{r["throughput"] / 1e6:>14.0f}{r["overhead"]:>10.2f}{r["accuracy"]:>12.1f}'
+                  f'  {"*" if i in front else ""}')
+    for size, rows in res.items():
+        best = recommend(rows, args.budget)
+        print(f'{size:g}GB: 推荐间隔 {best["interval"] * 1e3:g} ms '
+              f'(开销 {best["overhead"]:.2f}%, 准确率 {best["accuracy"]:.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import os
+
+import numpy as np
+
+# --- 随机数生成器 ---
+# 所有随机图都显式接收一个 np.random.Generator (PCG64)，整张图的抽样按块一次生成，
+# 不使用 np.random 的全局状态；并行或单独复现某次实现时各自创建生成器即可
+# (多个独立实现见 montecarlo.py 的 SeedSequence.spawn)
+# 兼容模式 FIG_LEGACY_RNG=1: spi.py / drift.py 改回 np.random.seed(42) 时的 RandomState 流，
+# 按原先的抽样顺序逐位复现旧图，用于回归测试。ring.py 的数据已改由 ringbuf.py 的写合并
+# 模拟器生成，模型与原先不同，原先的图无法复现，两种模式下都使用 PCG64
+SEED = 42
+LEGACY = os.environ.get('FIG_LEGACY_RNG', '') not in ('', '0')
+
+
+def generator(seed=SEED):
+    return np.random.Generator(np.random.PCG64(seed))
+
+
+def legacy(seed=SEED):
+    """兼容模式下为旧的 RandomState，否则与 generator 相同"""
+    return np.random.RandomState(seed) if LEGACY else generator(seed)
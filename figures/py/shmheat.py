@@ -0,0 +1,228 @@
+import argparse
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import aging
+import numpy as np
+
+# --- 共享内存热度位图与无锁读写 (hotspot.tex) 的用户态原型 ---
+# 内核扫描线程 (生产者) 周期性地把本轮的脏位写进共享位图，用户态决策线程 (消费者)
+# 直接读映射的内存、运行多位老化并给出决策，不经过系统调用。这里用
+# multiprocessing.shared_memory 上的 NumPy 视图代替 mmap 的内核内存:
+# 1. 每个生产者负责一段互不重叠的位图 (对应一个内存槽)，段内按字节整体写入，
+#    因此不需要逐位的原子操作；每段在头部有自己的控制字
+# 2. seqlock: 写之前序号 +1 (奇数)，写完 +1 (偶数)。读者先读序号，为奇数时让出 CPU 等待
+#    (计为自旋)，否则拷贝整段再读序号，前后不同即为撕裂读，重试
+# 3. epoch 交换 (双缓冲): 已发布的代数为 g 时前台是缓冲区 g & 1。生产者写第 g + 1 帧之前
+#    先把 "正在写" 的代数置为 g + 1，再写后台缓冲区 (g + 1) & 1，写完把代数置为 g + 1 发布。
+#    读者读代数 g，拷贝缓冲区 g & 1，再读 "正在写" 的代数 w: 这块缓冲区要到第 g + 2 帧才会
+#    被改写，而写之前 w 已经是 g + 2，因此 w - g >= 2 即为撕裂读，重试；生产者只写了另一块
+#    缓冲区 (w = g + 1) 时拷贝仍然完整。只看发布的代数是不够的: 翻转一次之后生产者就开始
+#    改写读者正在拷贝的缓冲区，而此时发布的代数只比 g 大 1
+# 控制字都是共享内存里的 int64，依赖平台对对齐 8 字节写入的原子性与 x86 的写入顺序；
+# 弱内存序的平台 (ARM) 上内核实现需要再加 smp_wmb / smp_rmb
+PROTOCOLS = ['seqlock', 'epoch']
+SEQ, WRITE, TIME0, TIME1 = range(4)     # 每个生产者的控制字: 序号/已发布的代数、正在写的代数、两块缓冲区的采样时刻
+FIELDS = 4
+STOP = 0                                # 全局控制字: 停止标志
+N_PAGES = 1 << 18        # 1GB 客户机
+DIRTY = 0.02             # 每次采样被写脏的页面比例
+PERIOD = 1e-3            # 生产者的采样周期 (s)
+DURATION = 2.0           # 每项测试的时长 (s)
+PRODUCERS = [1, 2, 4, 8]
+PERCENTILES = [50, 99]
+
+
+class HeatMap:
+    """共享内存中的控制字与 (两块) 位图；name 为 None 时创建，否则按名字附加"""
+
+    def __init__(self, n_pages, producers, name=None):
+        self.n_pages, self.producers = n_pages, producers
+        self.n_bytes = -(-n_pages // 8)
+        size = 8 * (1 + producers * FIELDS) + 2 * self.n_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.flags = np.ndarray(1, dtype=np.int64, buffer=self.shm.buf)
+        self.ctrl = np.ndarray((producers, FIELDS), dtype=np.int64, buffer=self.shm.buf, offset=8)
+        self.bufs = np.ndarray((2, self.n_bytes), dtype=np.uint8, buffer=self.shm.buf,
+                               offset=8 * (1 + producers * FIELDS))
+        if name is None:
+            self.flags[:] = 0
+            self.ctrl[:] = 0
+            self.bufs[:] = 0
+        # 各生产者负责的字节范围
+        self.bounds = np.linspace(0, self.n_bytes, producers + 1).astype(np.intp)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # 先释放引用共享缓冲区的视图，否则 SharedMemory.close 会报错
+        del self.flags, self.ctrl, self.bufs
+        self.shm.close()
+
+
+def _frames(rng, n_bytes, count=8, dirty=DIRTY, check=False):
+    """预先生成若干帧脏位图，测试时循环使用，不把随机数生成计入生产者开销
+
+    check 时每帧整段填同一个字节 (1, 2, ...)，读者拿到的段内字节不全相同即为撕裂
+    """
+    if check:
+        return np.repeat(np.arange(1, count + 1, dtype=np.uint8)[:, None], n_bytes, axis=1)
+    return np.packbits(rng.random((count, n_bytes * 8)) < dirty, axis=1)
+
+
+def _producer(name, n_pages, producers, index, protocol, period, seed, check):
+    heat = HeatMap(n_pages, producers, name)
+    lo, hi = heat.bounds[index], heat.bounds[index + 1]
+    ctrl = heat.ctrl[index]
+    frames = _frames(np.random.default_rng(seed), hi - lo, check=check)
+    i = 0
+    while not heat.flags[STOP]:
+        frame, now = frames[i % len(frames)], time.perf_counter_ns()
+        if protocol == 'seqlock':
+            ctrl[SEQ] += 1
+            heat.bufs[0, lo:hi] = frame
+            ctrl[TIME0] = now
+            ctrl[SEQ] += 1
+        else:
+            gen = int(ctrl[SEQ]) + 1
+            back = gen & 1
+            ctrl[WRITE] = gen
+            heat.bufs[back, lo:hi] = frame
+            ctrl[TIME0 + back] = now
+            ctrl[SEQ] = gen
+        i += 1
+        time.sleep(period)
+    heat.close()
+
+
+def _read(heat, index, protocol, out):
+    """把第 index 段拷贝到 out，返回 (采样时刻, 代数, 撕裂读次数, 自旋次数)
+
+    撕裂读只计拷贝之后校验失败的次数；seqlock 遇到写者正在写 (序号为奇数) 时不拷贝，
+    让出 CPU 后重新读序号，计为自旋。单核上忙等会占满时间片，写者反而写不完
+    """
+    ctrl = heat.ctrl[index]
+    lo, hi = heat.bounds[index], heat.bounds[index + 1]
+    torn = spins = 0
+    while True:
+        s1 = int(ctrl[SEQ])
+        if protocol == 'seqlock':
+            if s1 & 1:
+                spins += 1
+                time.sleep(0)
+                continue
+            out[lo:hi] = heat.bufs[0, lo:hi]
+            t = int(ctrl[TIME0])
+            if int(ctrl[SEQ]) == s1:
+                return t, s1 // 2, torn, spins
+        else:
+            front = s1 & 1
+            out[lo:hi] = heat.bufs[front, lo:hi]
+            t = int(ctrl[TIME0 + front])
+            if int(ctrl[WRITE]) - s1 < 2:
+                return t, s1, torn, spins
+        torn += 1
+
+
+def _consumer(name, n_pages, producers, protocol, duration, queue, check):
+    heat = HeatMap(n_pages, producers, name)
+    state = aging.Aging(n_pages)
+    bits = np.zeros(heat.n_bytes, dtype=np.uint8)
+    seen = np.zeros(producers, dtype=np.int64)  # 第 0 代尚未发布 (采样时刻为 0)，不计入决策与时延
+    latency, torn, spins, corrupt, decisions, busy = [], 0, 0, 0, 0, 0.0
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        stamps, fresh = [], False
+        for p in range(producers):
+            t, gen, n, spin = _read(heat, p, protocol, bits)
+            torn += n
+            spins += spin
+            if check:
+                segment = bits[heat.bounds[p]:heat.bounds[p + 1]]
+                corrupt += bool(len(segment)) and not (segment == segment[0]).all()
+            if gen != seen[p]:
+                seen[p], fresh = gen, True
+                stamps.append(t)
+        if not fresh:
+            time.sleep(0)
+            continue
+        state.step(bits)
+        np.count_nonzero(state.hot())           # 决策: 本轮的极热页集合
+        done = time.perf_counter_ns()
+        latency += [done - t for t in stamps]
+        busy += time.perf_counter() - start
+        decisions += 1
+    heat.close()
+    latency = np.asarray(latency) / 1e3
+    queue.put({
+        'decisions': decisions,
+        'torn': torn,
+        'spins': spins,
+        'corrupt': corrupt,
+        'latency_us': dict(zip(PERCENTILES, np.percentile(latency, PERCENTILES)))
+        if len(latency) else dict.fromkeys(PERCENTILES, float('nan')),
+        'throughput': decisions * n_pages / busy if busy else 0.0,
+    })
+
+
+def bench(producers, protocol, n_pages=N_PAGES, duration=DURATION, period=PERIOD, seed=0,
+          check=False):
+    """启动 producers 个生产者进程与一个消费者进程，返回 dict:
+      decisions    消费者完成的决策次数
+      torn         撕裂读 (拷贝后校验失败、重试) 次数
+      spins        seqlock 等待写者写完的次数
+      corrupt      check 时通过了校验但内容不一致的拷贝数 (协议正确时为 0)
+      latency_us   采样到决策的时延分位数 (µs)
+      throughput   消费者吞吐 (页/s，只计读取与老化的时间)
+    """
+    heat = HeatMap(n_pages, producers)
+    queue = mp.Queue()
+    try:
+        workers = [mp.Process(target=_producer, args=(heat.name, n_pages, producers, i, protocol,
+                                                      period, (seed, i), check))
+                   for i in range(producers)]
+        consumer = mp.Process(target=_consumer, args=(heat.name, n_pages, producers, protocol,
+                                                      duration, queue, check))
+        for w in workers:
+            w.start()
+        consumer.start()
+        result = queue.get()
+        consumer.join()
+        heat.flags[STOP] = 1
+        for w in workers:
+            w.join()
+    finally:
+        heat.close()
+        heat.shm.unlink()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='共享内存热度位图: 无锁读写基准')
+    parser.add_argument('--pages', type=int, default=N_PAGES, help='页面数 (默认 1GB 客户机)')
+    parser.add_argument('--producers', type=int, nargs='+', default=PRODUCERS, help='生产者进程数')
+    parser.add_argument('--protocol', choices=PROTOCOLS, nargs='+', default=PROTOCOLS)
+    parser.add_argument('--period', type=float, default=PERIOD, help='生产者的采样周期 (s)')
+    parser.add_argument('--duration', type=float, default=DURATION, help='每项测试的时长 (s)')
+    parser.add_argument('--check', action='store_true',
+                        help='生产者每帧整段写同一个字节，统计通过校验却不一致的拷贝')
+    args = parser.parse_args()
+
+    print(f'{"协议":<10}{"生产者":>6}{"决策":>8}'
+          + ''.join(f'{"p" + str(q) + " (µs)":>12}' for q in PERCENTILES)
+          + f'{"吞吐 (M页/s)":>14}{"撕裂读":>8}{"自旋":>8}' + (f'{"不一致":>8}' if args.check else ''))
+    for protocol in args.protocol:
+        for n in args.producers:
+            r = bench(n, protocol, args.pages, args.duration, args.period, check=args.check)
+            print(f'{protocol:<10}{n:>6}{r["decisions"]:>8}'
+                  + ''.join(f'{r["latency_us"][q]:>12.0f}' for q in PERCENTILES)
+                  + f'{r["throughput"] / 1e6:>14.1f}{r["torn"]:>8}{r["spins"]:>8}'
+                  + (f'{r["corrupt"]:>8}' if args.check else ''))
+
+
+if __name__ == '__main__':
+    main()
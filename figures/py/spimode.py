@@ -0,0 +1,159 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- SPI 三级自适应快照状态机 (strategy.tex) ---
+# 1. SPI = α·N(L_cpu) + β·N(D_io) + γ·(1 - N(M_free)) + ε·(1 - N(E_bat))
+# 2. 迟滞比较: 只有 SPI 持续 (连续 hold 个采样) 超过 T + Δ 才升级，持续低于 T - Δ 才降级
+# 3. 输入以分块流的方式读入，状态在块之间延续，内存占用与日志长度无关
+LOW, STANDARD, HIGH = 0, 1, 2
+MODE_NAMES = {LOW: '低压模式', STANDARD: '标准模式', HIGH: '高压模式'}
+
+T_LOW = 0.3
+T_HIGH = 0.8
+DELTA = 0.02     # 安全边际 Δ
+HOLD = 2         # 需要连续满足条件的采样数 (200ms 采样时为 400ms)
+
+# 多维融合的权重 (α, β, γ, ε) 与归一化上限 X_max
+WEIGHTS = {'cpu': 0.4, 'io': 0.3, 'mem_free': 0.2, 'battery': 0.1}
+MAXIMA = {'cpu': 100.0, 'io': 32.0, 'mem_free': 1.0, 'battery': 100.0}
+
+# HPRO 各模式下的归一化尾延迟，进入高压模式时先有一个切换尖峰:
+# 0.4s 内从 1.0 升至 1.3，再用 0.6s 回撤到受控高值 1.2 (与 spisim.py 一致)
+MODE_LATENCY = np.array([1.0, 1.0, 1.2])
+SPIKE_RISE, SPIKE_FALL, SPIKE_PEAK = 0.4, 0.6, 1.3
+
+
+def fuse(cpu, io, mem_free, battery, weights=WEIGHTS, maxima=MAXIMA):
+    """多维资源融合: 把原始监控指标换算为 [0, 1] 的 SPI"""
+    def norm(x, name):
+        return np.clip(np.asarray(x, dtype=float) / maxima[name], 0.0, 1.0)
+
+    return (weights['cpu'] * norm(cpu, 'cpu')
+            + weights['io'] * norm(io, 'io')
+            + weights['mem_free'] * (1.0 - norm(mem_free, 'mem_free'))
+            + weights['battery'] * (1.0 - norm(battery, 'battery')))
+
+
+def _desired(mode, spi, t_low, t_high, delta):
+    """在当前模式下，每个采样点 "想要" 切换到的模式 (未满足迟滞条件时等于 mode)"""
+    if mode == LOW:
+        return np.where(spi > t_high + delta, HIGH, np.where(spi > t_low + delta, STANDARD, LOW))
+    if mode == STANDARD:
+        return np.where(spi > t_high + delta, HIGH, np.where(spi < t_low - delta, LOW, STANDARD))
+    return np.where(spi < t_low - delta, LOW, np.where(spi < t_high - delta, STANDARD, HIGH))
+
+
+def _first_completed_run(cond, carry, hold):
+    """cond 中第一个使连续 True 长度 (含上一段带入的 carry) 达到 hold 的下标，以及段末的连续长度"""
+    idx = np.arange(len(cond))
+    last_false = np.maximum.accumulate(np.where(cond, -1, idx))
+    run = np.where(last_false < 0, idx + 1 + carry, idx - last_false)
+    hit = np.flatnonzero(run >= hold)
+    return (hit[0] if len(hit) else -1), (run[-1] if len(run) else carry)
+
+
+class ModeMachine:
+    """可分块喂入的迟滞状态机，块之间保留当前模式、计数和切换时刻"""
+
+    def __init__(self, t_low=T_LOW, t_high=T_HIGH, delta=DELTA, hold=HOLD,
+                 mode=LOW, window=4096):
+        self.t_low, self.t_high, self.delta, self.hold = t_low, t_high, delta, hold
+        self.mode = mode
+        self.window = window       # 每次向前查找切换点的长度
+        self.run = 0               # 当前已连续满足切换条件的采样数
+        self.switched_at = -np.inf  # 最近一次进入当前模式的时刻
+        self.transitions = []      # [(时刻, 原模式, 新模式)]
+
+    def feed(self, t, spi):
+        """处理一块数据，返回每个采样点的模式与 HPRO 延迟"""
+        t = np.asarray(t, dtype=float)
+        spi = np.asarray(spi, dtype=float)
+        modes = np.empty(len(spi), dtype=np.int8)
+        entered = np.empty(len(spi))
+
+        pos = 0
+        while pos < len(spi):
+            end = min(pos + self.window, len(spi))
+            desired = _desired(self.mode, spi[pos:end], self.t_low, self.t_high, self.delta)
+            hit, run = _first_completed_run(desired != self.mode, self.run, self.hold)
+            if hit < 0:
+                modes[pos:end] = self.mode
+                entered[pos:end] = self.switched_at
+                self.run = run
+                pos = end
+                continue
+
+            # 切换点之前保持原模式，从切换点开始进入新模式
+            switch = pos + hit
+            modes[pos:switch] = self.mode
+            entered[pos:switch] = self.switched_at
+            new_mode = int(desired[hit])
+            self.transitions.append((t[switch], self.mode, new_mode))
+            self.mode, self.switched_at, self.run = new_mode, t[switch], 0
+            pos = switch
+
+        return modes, latency(t, modes, entered)
+
+
+def latency(t, modes, entered):
+    """根据模式和进入该模式的时刻计算 HPRO 的归一化尾延迟 (不含噪声)"""
+    lat = MODE_LATENCY[modes]
+    since = t - entered
+    high = modes == HIGH
+    rise = high & (since < SPIKE_RISE)
+    fall = high & (since >= SPIKE_RISE) & (since < SPIKE_RISE + SPIKE_FALL)
+    lat = np.where(rise, 1.0 + (SPIKE_PEAK - 1.0) * since / SPIKE_RISE, lat)
+    lat = np.where(fall, SPIKE_PEAK - (SPIKE_PEAK - MODE_LATENCY[HIGH])
+                   * (since - SPIKE_RISE) / SPIKE_FALL, lat)
+    return lat
+
+
+def read_chunks(path, chunksize=1_000_000):
+    """分块读取监控日志: 含 spi 列时直接使用，否则由 cpu/io/mem_free/battery 融合计算"""
+    for df in pd.read_csv(path, chunksize=chunksize):
+        if 'spi' in df:
+            spi = df['spi'].to_numpy()
+        else:
+            spi = fuse(df['cpu'], df['io'], df['mem_free'], df['battery'])
+        yield df['time'].to_numpy(), spi
+
+
+def replay(chunks, machine=None, out=None):
+    """把 (t, spi) 数据块依次送入状态机；out 给出时把逐点结果追加写入 CSV"""
+    machine = machine or ModeMachine()
+    samples, cost = 0, 0.0
+    for i, (t, spi) in enumerate(chunks):
+        start = time.perf_counter()
+        modes, lat = machine.feed(t, spi)
+        cost += time.perf_counter() - start
+        samples += len(t)
+        if out is not None:
+            pd.DataFrame({'time': t, 'spi': spi, 'mode': modes, 'latency_hpro': lat}).to_csv(
+                out, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    return machine, samples, cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description='回放 SPI 序列，模拟三级快照模式切换')
+    parser.add_argument('log', nargs='?', default='spi_latency_sampled_data.csv',
+                        help='含 time,spi (或 time,cpu,io,mem_free,battery) 列的 CSV')
+    parser.add_argument('-o', '--out', help='逐点输出 time,spi,mode,latency_hpro 的 CSV')
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    parser.add_argument('--delta', type=float, default=DELTA)
+    parser.add_argument('--hold', type=int, default=HOLD)
+    args = parser.parse_args()
+
+    machine = ModeMachine(delta=args.delta, hold=args.hold)
+    machine, samples, cost = replay(read_chunks(args.log, args.chunksize), machine, args.out)
+
+    for t, old, new in machine.transitions:
+        print(f'{t:10.3f}s  {MODE_NAMES[old]} -> {MODE_NAMES[new]}')
+    print(f'{samples} 个采样, {len(machine.transitions)} 次切换, '
+          f'{cost * 1e3 / max(samples, 1):.6f} ms/采样')
+
+
+if __name__ == '__main__':
+    main()
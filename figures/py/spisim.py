@@ -0,0 +1,61 @@
+import numpy as np
+import spimode
+
+# --- spi.py 的 SPI 与尾延迟模拟引擎 (向量化) ---
+# 不依赖绘图，montecarlo.py 可以直接导入而不改动 rcParams
+# 三个时间窗口 (起点 s, 模式): 0-20s 低压, 20-40s 高压, 40s 之后标准
+# simulate() 的负载分段与图中的模式背景都取自这里
+WINDOWS = [(0, spimode.LOW), (20, spimode.HIGH), (40, spimode.STANDARD)]
+DURATION = 60
+NOISE_SCALES = {
+    'spi': 0.02,
+    'lat_base': 0.01,
+    'lat_agg_burst': 0.5,
+    'lat_agg_mid': 0.2,
+    'lat_hpro_small': 0.05,  # HPRO 专用微小波动
+}
+
+
+def sample_noise(rng, n, size=()):
+    """一次抽出全部噪声，返回 {名称: 形状为 size + (n,) 的数组}
+
+    rng 为 np.random.Generator；兼容模式下传入 RandomState(seed) (size 为空) 时，
+    抽样顺序与原先 np.random.seed(seed) 后逐个 np.random.normal 完全一致
+    """
+    block = rng.standard_normal(tuple(size) + (len(NOISE_SCALES), n))
+    return {name: block[..., i, :] * scale for i, (name, scale) in enumerate(NOISE_SCALES.items())}
+
+
+def simulate(t, noise):
+    """根据时间轴 t 和噪声计算 SPI 与三种策略的延迟
+
+    noise 中的数组形状为 (..., len(t))，前面的维度 (例如种子) 会原样保留，
+    因此一次调用即可同时模拟多个种子
+    """
+    t_high, t_std = WINDOWS[1][0], WINDOWS[2][0]
+    low = t < t_high
+    high = (t >= t_high) & (t < t_std)
+    regimes = [low, t < t_std]
+
+    # 1.1 SPI 系统压力指数
+    spi = np.select(regimes, [0.2, 0.88], 0.55) + noise['spi']
+
+    # 1.2 激进策略: 低负载 1.0；高负载立刻到 4.0 并叠加大幅波动；标准模式降到 2.0，中等波动
+    val = np.select(regimes, [1.0, 4.0], 2.0)
+    extra = np.where(low, 0.0, np.where(high, noise['lat_agg_burst'], noise['lat_agg_mid']))
+    lat_aggressive = val + (noise['lat_base'] + extra)
+
+    # 1.3 保守策略
+    lat_conservative = 1.0 + noise['lat_base']
+
+    # 1.4 HPRO: 进入高压窗口时有短暂尖峰 (0.4s 内从 1.0 升至 1.3)，
+    # 随后回撤 (0.6s 内降至 1.2)，之后稳定在受控高值 1.2
+    peak = t_high + 0.4
+    base_hpro = np.select(
+        [t < peak, t < peak + 0.6],
+        [1.0 + 0.3 * ((t - t_high) / 0.4), 1.3 - 0.1 * ((t - peak) / 0.6)],
+        1.2)
+    lat_hpro = np.where(high, base_hpro + noise['lat_hpro_small'], 1.0 + noise['lat_base'])
+    lat_hpro = np.maximum(lat_hpro, 1.0)  # 确保不低于基准线
+
+    return spi, lat_aggressive, lat_conservative, lat_hpro
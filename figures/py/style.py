@@ -0,0 +1,94 @@
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+import matplotlib
+import matplotlib.font_manager as font_manager
+import matplotlib.pyplot as plt
+
+# --- 1. 统一的论文绘图风格 ---
+# 所有脚本共用的 rcParams，只读；个别图需要不同字号等可以在 apply() 时覆盖
+STYLE = MappingProxyType({
+    'font.family': 'sans-serif',
+    'font.size': 14,
+    'axes.linewidth': 1.5,
+    'axes.unicode_minus': False,  # 解决负号显示问题
+    'xtick.direction': 'in',
+    'ytick.direction': 'in',
+})
+
+# 中文字体候选链，排在前面的优先
+# Windows 一般有 SimHei/SimSun，mac 用户没装 SimSun 可以用 'Arial Unicode MS' 或 'Songti SC'，
+# Linux 上常见的是 Noto / 文泉驿
+CJK_FAMILIES = ['SimHei', 'SimSun', 'Arial Unicode MS', 'Songti SC',
+                'Noto Sans CJK SC', 'Source Han Sans SC', 'WenQuanYi Zen Hei']
+
+# 解析结果缓存到磁盘，避免每个脚本启动时都让 font_manager 挨个回退查找
+FONT_CACHE = os.path.join(matplotlib.get_cachedir(), 'lunwen-fonts.json')
+
+
+# --- 2. 字体解析 ---
+def _scan_fonts():
+    found = []
+    for family in CJK_FAMILIES:
+        try:
+            path = font_manager.findfont(font_manager.FontProperties(family=family),
+                                         fallback_to_default=False)
+        except ValueError:
+            continue
+        if path not in [p for _, p in found]:
+            found.append((font_manager.get_font(path).family_name, path))
+    return found
+
+
+@lru_cache(maxsize=None)
+def resolve_fonts(rescan=False):
+    """返回 [(字体名, 字体文件)]，按优先级排列；找不到任何中文字体时为空"""
+    key = {'matplotlib': matplotlib.__version__, 'families': CJK_FAMILIES}
+    if not rescan:
+        try:
+            with open(FONT_CACHE, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached['key'] == key and all(os.path.exists(p) for _, p in cached['fonts']):
+                return tuple(tuple(item) for item in cached['fonts'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    fonts = _scan_fonts()
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        with open(FONT_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'fonts': fonts}, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+    return tuple(tuple(item) for item in fonts)
+
+
+# --- 3. 对外接口 ---
+def apply(overrides=None):
+    """把统一风格写入 plt.rcParams，overrides 用于单张图的个别调整"""
+    fonts = resolve_fonts()
+    for _, path in fonts:
+        font_manager.fontManager.addfont(path)
+
+    rc = dict(STYLE)
+    rc['font.sans-serif'] = [name for name, _ in fonts] + ['DejaVu Sans']
+    rc.update(overrides or {})
+    plt.rcParams.update(rc)
+
+
+def font(size=None):
+    """图例等需要单独指定字体时使用：直接指向解析好的字体文件，不再走回退查找"""
+    fonts = resolve_fonts()
+    if fonts:
+        return font_manager.FontProperties(fname=fonts[0][1], size=size)
+    return font_manager.FontProperties(family='sans-serif', size=size)
+
+
+if __name__ == '__main__':
+    # python style.py 重新扫描字体 (安装了新字体之后执行一次)
+    resolve_fonts.cache_clear()
+    for name, path in resolve_fonts(rescan=True):
+        print(f'{name}: {path}')
+    print(f'缓存: {FONT_CACHE}')
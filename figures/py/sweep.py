@@ -0,0 +1,103 @@
+import argparse
+import csv
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import batch
+import dptrace
+import matplotlib.pyplot as plt
+import numpy as np
+import style
+
+# --- 快照周期扫描: 周期长短对冷/热页面分布的影响 ---
+# 每个 (负载, 周期组) 是一个作业，组内所有周期共用一遍 trace 扫描
+# (见 dptrace.dirty_counts_sweep)；所有周期都取为最短周期的整数倍
+PERIODS = [0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0]
+BUCKETS = ['0', '1', '2', '3', '4', '>=5']
+COLORS = ['#7f7f7f', '#1f77b4', '#2ca02c', '#9467bd', '#ff7f0e', '#d62728']
+
+
+def sweep(paths, periods=PERIODS, workers=None):
+    """{负载: trace 路径} -> 整理好的行 [(负载, 周期, 分桶, 占比)]"""
+    workers = workers or os.cpu_count() or 1
+    periods = sorted(periods)
+    # 负载数少于核数时，再把周期拆成若干组分给多余的核
+    groups = np.array_split(periods, max(1, min(len(periods), workers // max(len(paths), 1))))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(w, pool.submit(dptrace.dirty_counts_sweep, path, list(group),
+                                   len(BUCKETS), periods[0]))
+                   for w, path in paths.items() for group in groups]
+        for workload, future in futures:
+            actual, pct = future.result()
+            for period, values in zip(actual, pct):
+                rows += [(workload, float(period), b, float(v)) for b, v in zip(BUCKETS, values)]
+    return rows
+
+
+def write_table(rows, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['workload', 'period', 'bucket', 'pct'])
+        writer.writerows(rows)
+
+
+def plot(rows, path):
+    """小多图: 每个负载一张，横轴为快照周期 (对数)，各分桶占比一条线，突出 >=5"""
+    style.apply()
+    workloads = list(dict.fromkeys(r[0] for r in rows))
+    ncols = min(3, len(workloads))
+    nrows = -(-len(workloads) // ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(4 * ncols, 3.2 * nrows),
+                             sharex=True, sharey=True, squeeze=False)
+
+    for ax, workload in zip(axes.flat, workloads):
+        for bucket, color in zip(BUCKETS, COLORS):
+            points = sorted((r[1], r[3]) for r in rows if r[0] == workload and r[2] == bucket)
+            x, y = zip(*points)
+            hot = bucket == BUCKETS[-1]
+            ax.plot(x, y, 'o-' if hot else '-', color=color, label=bucket,
+                    linewidth=2.5 if hot else 1.2, markersize=4, markerfacecolor='white')
+        ax.set_xscale('log')
+        ax.set_yscale('log')  # 0 次的页面通常占 90% 以上，对数轴才看得清 >=5 的变化
+        ax.set_title(workload, fontsize=14)
+        ax.yaxis.grid(True, linestyle='--', alpha=0.3)
+    for ax in axes.flat[len(workloads):]:
+        ax.set_visible(False)
+
+    for ax in axes[-1]:
+        ax.set_xlabel('快照周期 (s)', fontsize=14)
+    for ax in axes[:, 0]:
+        ax.set_ylabel('内存页面占比 (%)', fontsize=14)
+    axes.flat[0].legend(title='脏化次数', frameon=True, edgecolor='black', fancybox=False,
+                        fontsize=10, ncol=2)
+
+    fig.tight_layout()
+    fig.savefig(path, format='pdf', bbox_inches='tight')
+    batch.show(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='快照周期扫描')
+    parser.add_argument('trace', nargs='*', help='脏页 trace (默认 traces/*.dpt，负载名取文件名)')
+    parser.add_argument('--periods', type=float, nargs='+', default=PERIODS, help='快照周期 (s)')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    parser.add_argument('-o', '--out', default='sweep.csv', help='整理后的结果表')
+    parser.add_argument('--figure', default='sweep.pdf')
+    args = parser.parse_args()
+
+    traces = args.trace or sorted(glob.glob(os.path.join(dptrace.TRACES, '*.dpt')))
+    if not traces:
+        parser.error(f'没有找到 trace，可以放在 {dptrace.TRACES}/<负载>.dpt')
+    paths = {os.path.splitext(os.path.basename(p))[0]: p for p in traces}
+
+    rows = sweep(paths, args.periods, args.jobs)
+    write_table(rows, args.out)
+    plot(rows, args.figure)
+    print(f'{len(paths)} 个负载 × {len(args.periods)} 个周期 -> {args.out}, {args.figure}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import dedup
+import numpy as np
+
+
+def test_top_bit_flips_do_not_collide():
+    # 两个 float64 取反 = 两个字的最高位同时翻转，线性的预哈希下 2^63 + 2^63 ≡ 0
+    page = np.random.default_rng(1).random(dedup.WORDS)
+    flipped = page.copy()
+    flipped[[3, 100]] *= -1
+    keys = dedup.fingerprint(np.stack([page.view(np.uint64), flipped.view(np.uint64)]))
+    assert (keys[0] != keys[1]).any()
+    assert not dedup.FingerprintTable().insert(keys).any()
+
+
+def test_identical_pages_are_duplicates():
+    pages = np.random.default_rng(2).integers(0, 1 << 64, (3, dedup.WORDS), dtype=np.uint64)
+    keys = dedup.fingerprint(pages[[0, 1, 0, 2, 1]])
+    assert dedup.FingerprintTable().insert(keys).tolist() == [False, False, True, False, True]
+
+
+def test_fingerprint_does_not_depend_on_batching():
+    pages = np.random.default_rng(3).integers(0, 1 << 64, (dedup.MIX * 2 + 5, dedup.WORDS),
+                                              dtype=np.uint64)
+    whole = dedup.fingerprint(pages)
+    assert (np.concatenate([dedup.fingerprint(pages[:7]), dedup.fingerprint(pages[7:])]) == whole).all()
@@ -0,0 +1,281 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import aging
+import dptrace
+import migrate
+import numpy as np
+
+# --- 两阶段工作集感知快照策略的回放 (hotspot.tex / strategy.tex) ---
+# 逐个采样周期回放脏页 trace，每个页面的热度为 aging.Aging 的 1 字节老化状态，
+# 分级结果 (极热 / 温热 / 冷寂) 与 "待保存"、"已保存过" 标记都是 np.packbits 打包的位图，
+# 每个周期只在 页数/8 字节上做位运算:
+# 1. 热度感知预拷贝: 脏页置 "待保存"，后台按带宽预算依次保存冷寂页、温热页，
+#    极热页在线阶段一律跳过。老化位宽不再变化、且极热/温热页数相对上一周期的变化
+#    连续 STABLE 个周期不超过工作集的 1 - CONVERGE (至少容许全部页面的 aging.HOT_LOW)
+#    时视为热度模型收敛，立即结束
+#    (不管已保存了多少)；最长 MAX_PRECOPY。页面级的集合在随机写入下每个周期都会抖动，
+#    因此按分级规模而不是逐页比较判断收敛
+# 2. 停机窗口: 保存所有待保存的极热页 (最终窗口大小)
+# 3. 差异化后拷贝: 恢复运行后先温热页、后冷寂页；业务写入尚未保存的页面触发写时复制，
+#    该页立即同步保存 (计为一次缺页)。trace 结束时剩余页面按带宽补齐
+# 重复写入节省 = 朴素预拷贝的重传页数 - 本策略的重传页数。朴素预拷贝在同一 trace、同一带宽下
+# 按页号顺序反复保存脏页，直到剩余脏页可在 migrate.DOWNTIME_TARGET 内写完或达到 MAX_PRECOPY
+PAGE = 4096
+MB = 2**20 // PAGE       # 每 MB 的页数
+CONVERGE = 0.95          # 分级规模的稳定度
+STABLE = 3               # 连续满足 CONVERGE 的周期数
+MIN_FRAMES = aging.MAX_BITS   # 至少经过一个完整的老化窗口
+MAX_PRECOPY = 30.0       # 预拷贝时长上限 (s)
+DURATION = 120.0         # 合成 trace 的时长 (s)
+TIERS = ['hot', 'warm', 'cold']
+PHASES = ['online', 'stop', 'post']
+
+# 平台参数: 带宽 (MB/s) 与每个页面对业务造成的停顿 (s)
+#   save   后台保存一页 (拷贝 + 提交 I/O) 折算到业务的停顿
+#   fault  后拷贝阶段写入未保存页面: 写保护异常 + 同步拷贝
+#   scan   每个采样周期每页的脏位扫描与老化
+PLATFORMS = {
+    '3b': {'bandwidth': 20, 'save': 8e-6, 'fault': 70e-6, 'scan': 4e-9},
+    '4b': {'bandwidth': 30, 'save': 5e-6, 'fault': 40e-6, 'scan': 2e-9},
+}
+
+
+def _pack(pages, n_pages):
+    """PFN 数组 -> 打包位图"""
+    mask = np.zeros(n_pages, dtype=bool)
+    mask[np.asarray(pages, dtype=np.intp)] = True
+    return np.packbits(mask)
+
+
+def _count(bits):
+    return int(np.bitwise_count(bits).sum())
+
+
+class _Saver:
+    """待保存位图、已保存位图，以及按阶段 / 分级统计的写入页数"""
+
+    def __init__(self, n_pages):
+        self.n_pages = n_pages
+        self.pending = np.packbits(np.ones(n_pages, dtype=bool))   # 初始内存扫描: 全部待保存
+        self.saved = np.zeros_like(self.pending)
+        self.writes = {phase: dict.fromkeys(TIERS, 0) for phase in PHASES}
+        self.resaves = 0
+        self.phase = 'online'
+
+    def dirty(self, bits):
+        self.pending |= bits
+
+    def commit(self, tier, bits):
+        """保存位图 bits 中的页面 (必须都是待保存的)"""
+        self.resaves += _count(bits & self.saved)
+        self.saved |= bits
+        self.pending &= ~bits
+        n = _count(bits)
+        self.writes[self.phase][tier] += n
+        return n
+
+    def save(self, queues, budget):
+        """按 queues [(分级, 位图)] 的优先级、页号顺序保存至多 budget 页"""
+        left = budget
+        for tier, mask in queues:
+            if left <= 0:
+                break
+            cand = self.pending & mask
+            pages = np.flatnonzero(np.unpackbits(cand, count=self.n_pages))[:left]
+            if len(pages):
+                left -= self.commit(tier, _pack(pages, self.n_pages))
+        return budget - left
+
+
+def replay(frames, n_pages, platform='4b', interval=dptrace.SAMPLE_INTERVAL, max_precopy=MAX_PRECOPY):
+    """回放逐周期的脏页 (PFN 数组序列)，返回 dict:
+      bytes           {阶段: {分级: 字节}}
+      tier_bytes      {分级: 字节}
+      resaves         本策略的重传页数；naive_resaves 为朴素预拷贝的重传页数
+      saved_bytes     重复写入节省的字节数
+      final_pages     停机窗口保存的页数 (最终窗口大小)；final_bytes 为对应字节数，
+                      naive_final_pages 为朴素预拷贝的停机窗口页数，naive_precopy 为其预拷贝时长 (s)
+      faults          后拷贝阶段的写时复制次数
+      precopy / downtime / postcopy / duration   各阶段时长与总时长 (s)
+      perf_loss       估计的业务性能损失 (%)
+    """
+    p = PLATFORMS[platform]
+    rate = p['bandwidth'] * MB                     # 页/s
+    budget = int(rate * interval)
+    state = aging.Aging(n_pages)
+    tiered, naive = _Saver(n_pages), _Saver(n_pages)
+    everything = np.packbits(np.ones(n_pages, dtype=bool))
+    threshold = migrate.DOWNTIME_TARGET * rate
+
+    phase, naive_running = 'online', True
+    steps, post_steps, naive_steps, stable, prev = 0, 0, 0, 0, (-1, 0, 0)
+    hot = warm = cold = np.zeros_like(everything)
+    queues, final, faults = [], 0, 0
+    for pages in frames:
+        bits = _pack(pages, n_pages)
+        if naive_running:
+            # 朴素预拷贝自己计周期: 本策略结束后它仍按同样的 max_precopy 上限继续
+            naive_steps += 1
+            naive.dirty(bits)
+            naive.save([('cold', everything)], budget)
+            naive_running = (_count(naive.pending) > threshold
+                             and naive_steps * interval < max_precopy)
+
+        if phase == 'online':
+            # 1. 热度感知预拷贝
+            steps += 1
+            tiered.dirty(bits)
+            state.step(bits)
+            hot = np.packbits(state.hot())
+            ws = np.packbits(state.working_set())
+            warm, cold = ws & ~hot, everything & ~ws
+            tiered.save([('cold', cold), ('warm', warm)], budget)
+
+            sizes = (state.bits, _count(hot), _count(warm))
+            change = abs(sizes[1] - prev[1]) + abs(sizes[2] - prev[2])
+            slack = max((1 - CONVERGE) * _count(ws), aging.HOT_LOW * n_pages)
+            stable = stable + 1 if sizes[0] == prev[0] and change <= slack else 0
+            prev = sizes
+            if steps >= MIN_FRAMES and stable >= STABLE or steps * interval >= max_precopy:
+                # 2. 停机窗口: 极热页
+                tiered.phase = phase = 'stop'
+                final = tiered.commit('hot', tiered.pending & hot)
+                # 3. 差异化后拷贝: 分级冻结在停机时刻
+                tiered.phase = phase = 'post'
+                warm = warm & tiered.pending
+                queues = [('warm', warm), ('cold', tiered.pending & ~warm)]
+        elif phase == 'post' and tiered.pending.any():
+            # 写入尚未保存的页面: 写时复制，立即同步保存
+            post_steps += 1
+            bits &= tiered.pending
+            for tier, mask in queues:
+                faults += tiered.commit(tier, bits & mask)
+            tiered.save(queues, budget)
+        elif not naive_running:
+            break
+
+    if phase == 'online':
+        # trace 在预拷贝收敛之前就结束了
+        tiered.phase = 'stop'
+        final = tiered.commit('hot', tiered.pending & hot)
+        tiered.phase = 'post'
+        queues = [('warm', warm & tiered.pending), ('cold', tiered.pending & ~warm)]
+    rest = sum(tiered.commit(tier, tiered.pending & mask) for tier, mask in queues)
+    naive_final = _count(naive.pending)
+
+    precopy = steps * interval
+    downtime = final / rate
+    postcopy = post_steps * interval + rest / rate
+    online = sum(tiered.writes['online'].values())
+    post = sum(tiered.writes['post'].values()) - faults
+    stall = (downtime + (online + post) * p['save'] + faults * p['fault']
+             + steps * n_pages * p['scan'])
+    duration = precopy + downtime + postcopy
+    return {
+        'bytes': {phase: {t: n * PAGE for t, n in w.items()} for phase, w in tiered.writes.items()},
+        'tier_bytes': {t: sum(w[t] for w in tiered.writes.values()) * PAGE for t in TIERS},
+        'resaves': tiered.resaves,
+        'naive_resaves': naive.resaves,
+        'saved_bytes': (naive.resaves - tiered.resaves) * PAGE,
+        'final_pages': final,
+        'final_bytes': final * PAGE,
+        'naive_final_pages': naive_final,
+        'naive_precopy': naive_steps * interval,
+        'faults': faults,
+        'precopy': precopy,
+        'downtime': downtime,
+        'postcopy': postcopy,
+        'duration': duration,
+        'perf_loss': 100.0 * stall / max(duration, 1e-9),
+    }
+
+
+def synthetic_frames(rng, params, duration=DURATION, interval=dptrace.SAMPLE_INTERVAL,
+                     hot_share=migrate.HOT_SHARE):
+    """按 migrate.WORKLOADS 形式的负载参数生成逐周期脏页: 工作集前 hot 比例为热页，
+    吸收 hot_share 的写入，其余写入均匀落在温页上"""
+    wss = int(params['wss'])
+    w_hot = max(int(wss * params['hot']), 1)
+    for _ in range(int(round(duration / interval))):
+        n_hot = rng.poisson(params['rate'] * hot_share * interval)
+        n_warm = rng.poisson(params['rate'] * (1 - hot_share) * interval)
+        yield np.unique(np.concatenate([rng.integers(0, w_hot, n_hot),
+                                        rng.integers(w_hot, max(wss, w_hot + 1), n_warm)]))
+
+
+def run(workload, platform='4b', duration=DURATION, seed=0):
+    """回放一个负载: traces/ 下有 trace 时使用 trace，否则按 migrate.WORKLOADS 的参数合成"""
+    path = dptrace.find(workload)
+    if path:
+        result = replay(dptrace.frames(path), dptrace.header(path)['n_pages'], platform)
+    else:
+        params = migrate.WORKLOADS[workload]
+        rng = np.random.default_rng([seed, sum(workload.encode())])
+        result = replay(synthetic_frames(rng, params, duration), int(params['pages']), platform)
+    return {**result, 'trace': path is not None}
+
+
+def run_many(workloads, platform='4b', duration=DURATION, workers=None):
+    """并行回放多个负载，返回 {负载: 结果}"""
+    workers = workers or min(len(workloads), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {w: pool.submit(run, w, platform, duration) for w in workloads}
+        return {w: f.result() for w, f in futures.items()}
+
+
+def ingest(res, platform, run=None):
+    """把由 trace 回放得到的 HPRO 性能损失估计追加到结果库，作为新的一次实验；合成负载的结果不写入
+
+    性能损失来自 PLATFORMS 的代价模型而不是实测，写入单独的指标 perf_loss_3b_model /
+    perf_loss_4b_model，不与实测的 perf_loss_3b / perf_loss_4b 混在一起求均值与误差棒；
+    pl3b.py / pl4b.py 把它画成单独的 "ResSnap (模型)" 系列
+    """
+    import results
+
+    res = {w: r for w, r in res.items() if r['trace']}
+    if not res:
+        return 0
+    if run is None:
+        try:
+            run = int(np.max(results.column('run'))) + 1
+        except OSError:
+            run = 0
+    metric = f'perf_loss_{platform}_model'
+    results.append({'workload': list(res), 'system': ['HPRO'] * len(res),
+                    'metric': [metric] * len(res), 'run': [run] * len(res),
+                    'value': [r['perf_loss'] for r in res.values()]},
+                   {metric: '%'})
+    return len(res)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='两阶段工作集感知快照策略回放')
+    parser.add_argument('workloads', nargs='*', default=list(migrate.WORKLOADS),
+                        help='负载名 (traces/ 下无 trace 时按 migrate.py 的参数合成)')
+    parser.add_argument('--platform', choices=sorted(PLATFORMS), default='4b')
+    parser.add_argument('--duration', type=float, default=DURATION, help='合成 trace 的时长 (s)')
+    parser.add_argument('--ingest', action='store_true',
+                        help='把 trace 回放的性能损失估计追加到结果库 (perf_loss_<平台>_model，pl3b/pl4b 中的模型系列)')
+    parser.add_argument('-j', '--jobs', type=int, help='并行进程数')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    res = run_many(args.workloads, args.platform, args.duration, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f'{"负载":<10}{"极热 (MB)":>10}{"温热 (MB)":>10}{"冷寂 (MB)":>10}{"节省 (MB)":>10}'
+          f'{"最终窗口":>10}{"停机 (ms)":>10}{"缺页":>8}{"总时长 (s)":>11}{"性能损失 (%)":>13}')
+    for w, r in res.items():
+        mb = {t: b / 2**20 for t, b in r['tier_bytes'].items()}
+        print(f'{w + ("" if r["trace"] else "*"):<10}{mb["hot"]:>10.1f}{mb["warm"]:>10.1f}'
+              f'{mb["cold"]:>10.1f}{r["saved_bytes"] / 2**20:>10.1f}{r["final_pages"]:>10}'
+              f'{r["downtime"] * 1e3:>10.1f}{r["faults"]:>8}{r["duration"]:>11.1f}{r["perf_loss"]:>13.2f}')
+    print(f'* 为合成负载；耗时 {elapsed:.2f}s')
+    if args.ingest:
+        print(f'已追加 {ingest(res, args.platform)} 个负载到 perf_loss_{args.platform}_model')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# --- SPI 反馈式令牌桶 I/O 节流模拟 (flash.tex) ---
+# 1. 令牌生成速率 R_token = R_max × (1 - SPI)，SPI 按采样值保持到下一次采样
+# 2. 快照写请求进入 FIFO 队列，只有桶中有令牌时才能下发；桶容量 C 限制突发写入量
+# 3. 流体模型按固定时间步 (默认 1ms) 推进。记 A、G 为累计到达字节数与累计生成令牌数，
+#    贪心整形器的累计输出为 D(t) = min(A(t), C + G(t) + min_{s<=t} (A(s) - G(s)))，
+#    其中的最小值是前缀最小值 (np.minimum.accumulate)，整段时间轴一次算完，
+#    分块推进时只需在块之间带上 A、G 和前缀最小值 (同一步内生成的令牌先用于发送，再受桶容量限制)
+# 4. 业务 I/O 与快照 I/O 共用设备带宽 B_dev，业务需求取 SPI × B_dev；
+#    两者之和超出设备带宽的部分在设备队列中积压 (Lindley 递推，同样用前缀最小值求解)，
+#    积压 / B_dev 即排队时延，与没有快照写入时的积压相比得到快照对业务的干扰
+DT = 0.001
+R_MAX = 32 * 2**20       # 令牌最大生成速率 (B/s)
+CAPACITY = 2 * 2**20     # 桶容量 (B)
+B_DEV = 40 * 2**20       # Flash 持续写入带宽 (B/s)
+BIN = 0.1                # 输出带宽曲线的统计区间 (s)
+CHUNK = 1 << 16          # 每块的时间步数 (1ms 时约 65s)，中间数组能留在缓存中
+PERCENTILES = [50, 90, 99, 99.9]
+LAT_EDGES = np.geomspace(1e-6, 1e3, 901)  # 业务时延直方图的分桶边界 (s)，每个数量级 100 个
+
+
+def load_spi(path):
+    """读取 SPI 序列 (例如 spi.py 生成的 CSV 中的 time,spi 列)"""
+    df = pd.read_csv(path, usecols=['time', 'spi'])
+    return df['time'].to_numpy(), df['spi'].to_numpy()
+
+
+def spi_steps(spi_t, spi, dt=DT):
+    """把 SPI 序列展开到时间步上 (采样值保持)，覆盖一个完整周期；
+    模拟时长超过序列长度时按周期重复使用"""
+    period = spi_t[-1] + (spi_t[-1] - spi_t[-2] if len(spi_t) > 1 else 1.0)
+    t = np.arange(max(int(round(period / dt)), 1)) * dt
+    idx = np.searchsorted(spi_t, t + dt / 2, side='right') - 1
+    return np.clip(spi[np.maximum(idx, 0)], 0.0, 1.0)
+
+
+class TokenBucket:
+    """可分块推进的令牌桶整形器 (流体模型)，块之间保留累计量与前缀最小值"""
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.arrived = 0.0     # A: 累计到达字节数
+        self.tokens = 0.0      # G: 累计生成令牌数
+        self.low = 0.0         # min (A - G)，含 t = 0 时的 0 (初始时桶是满的)
+        self.sent = 0.0        # D: 累计下发字节数
+
+    @property
+    def backlog(self):
+        return self.arrived - self.sent
+
+    def feed(self, arrived, tokens):
+        """arrived / tokens 为每个时间步到达的字节数与生成的令牌数，返回每步的累计下发量 D"""
+        a = np.cumsum(arrived)
+        a += self.arrived
+        g = np.cumsum(tokens)
+        g += self.tokens
+        if len(g):
+            self.tokens = g[-1]
+        low = np.subtract(a, g)
+        np.minimum.accumulate(np.minimum(low, self.low, out=low), out=low)
+        sent = np.add(g, low, out=g)
+        sent += self.capacity
+        np.minimum(a, sent, out=sent)
+        if len(sent):
+            self.arrived, self.low, self.sent = a[-1], low[-1], sent[-1]
+        return sent
+
+
+class Queue:
+    """可分块推进的设备队列: Q_k = max(0, Q_{k-1} + x_k) = S_k - min(0, min_{j<=k} S_j)"""
+
+    def __init__(self):
+        self.total = 0.0       # S: x 的累计和
+        self.low = 0.0
+
+    def feed(self, x):
+        """x 为每个时间步的 (到达 - 服务能力)，返回每步结束时的积压"""
+        s = np.cumsum(x)
+        s += self.total
+        low = np.minimum(s, self.low)
+        np.minimum.accumulate(low, out=low)
+        if len(s):
+            self.total, self.low = s[-1], low[-1]
+        return np.subtract(s, low, out=s)
+
+
+def _percentiles(hist, qs):
+    """由直方图估计分位数 (取所在分桶的上边界)"""
+    cdf = np.cumsum(hist) / max(hist.sum(), 1)
+    return {q: float(LAT_EDGES[min(np.searchsorted(cdf, q / 100), len(LAT_EDGES) - 1)]) for q in qs}
+
+
+def _histogram(delay):
+    """按 LAT_EDGES 分桶计数 (等价于 searchsorted，零时延直接计入第一个桶)"""
+    hist = np.zeros(len(LAT_EDGES) + 1)
+    positive = delay[delay > LAT_EDGES[0]]
+    hist[0] = len(delay) - len(positive)
+    idx = np.ceil(np.log10(positive / LAT_EDGES[0]) * 100 - 1e-9).astype(np.int64)
+    hist += np.bincount(np.minimum(idx, len(LAT_EDGES)), minlength=len(hist))
+    return hist
+
+
+def simulate(req_t, req_bytes, spi_t, spi, duration, dt=DT, r_max=R_MAX, capacity=CAPACITY,
+             b_dev=B_DEV, adaptive=True, bin_size=BIN, chunk=CHUNK):
+    """回放快照写请求 (按到达时刻排序) 与 SPI 序列
+
+    adaptive=False 时令牌速率固定为 r_max (不随 SPI 调节)，作为对照
+    返回 dict:
+      time / snap_bw / biz_bw  每个统计区间的起点、快照实际写入带宽与业务需求带宽 (B/s)
+      delay                    每个已完成请求的排队时延 (s)，未完成的请求记为 NaN
+      delay_pct                快照请求排队时延的分位数
+      biz_pct                  业务 I/O 在设备队列中排队时延的分位数 (按时间加权)
+      interference             快照写入使业务 I/O 平均多排队的时间 (s)
+      busy                     业务 I/O 因快照写入而多排队的时间比例
+      backlog                  结束时仍在令牌桶队列中的字节数
+    """
+    req_t = np.asarray(req_t, dtype=float)
+    req_bytes = np.asarray(req_bytes, dtype=float)
+    n_steps = int(round(duration / dt))
+    per_bin = max(int(round(bin_size / dt)), 1)
+    chunk = max(chunk // per_bin, 1) * per_bin   # 每块包含整数个统计区间
+
+    levels = spi_steps(spi_t, spi, dt)
+    bucket = TokenBucket(capacity)
+    done = np.cumsum(req_bytes)                  # 每个请求完成时的累计下发量
+    delay = np.full(len(req_t), np.nan)
+    waiting = 0                                  # 最早的未完成请求
+    device, alone = Queue(), Queue()
+    hist = np.zeros(len(LAT_EDGES) + 1)
+    snap_bw, biz_bw = [], []
+    extra, busy = 0.0, 0
+
+    for start in range(0, n_steps, chunk):
+        stop = min(start + chunk, n_steps)
+        level = levels[np.arange(start, stop) % len(levels)]
+        rate = r_max * (1.0 - level) if adaptive else np.full(stop - start, float(r_max))
+
+        lo, hi = np.searchsorted(req_t, [start * dt, stop * dt])
+        step = np.minimum((req_t[lo:hi] / dt).astype(np.int64) - start, stop - start - 1)
+        arrived = np.bincount(step, weights=req_bytes[lo:hi], minlength=stop - start)
+        before = bucket.sent
+        sent = bucket.feed(arrived, rate * dt)
+
+        # 请求完成时刻: 累计下发量第一次达到该请求的累计字节数 (容差 0.5B 吸收舍入误差)
+        end = np.searchsorted(done, sent[-1] + 0.5, side='right') if len(sent) else waiting
+        k = np.searchsorted(sent, done[waiting:end] - 0.5)
+        delay[waiting:end] = (start + k + 1) * dt - req_t[waiting:end]   # 完成于该时间步结束时
+        waiting = end
+
+        # 设备队列: 有快照写入与只有业务 I/O 两种情况下的积压，差值即快照造成的干扰
+        snap = np.diff(sent, prepend=before)
+        biz = level * b_dev * dt
+        backlog, base = (device.feed(biz + snap - b_dev * dt), alone.feed(biz - b_dev * dt))
+        extra += (backlog - base).sum() * dt / b_dev
+        busy += np.count_nonzero(backlog > base)
+        hist += _histogram(backlog / b_dev)
+
+        n_bins = -(-(stop - start) // per_bin)
+        pad = n_bins * per_bin - (stop - start)
+        snap_bw.append(np.pad(snap, (0, pad)).reshape(n_bins, per_bin).sum(1) / bin_size)
+        biz_bw.append(np.pad(biz, (0, pad)).reshape(n_bins, per_bin).sum(1) / bin_size)
+
+    finished = delay[~np.isnan(delay)]
+    return {
+        'time': np.arange(-(-n_steps // per_bin)) * per_bin * dt,
+        'snap_bw': np.concatenate(snap_bw),
+        'biz_bw': np.concatenate(biz_bw),
+        'delay': delay,
+        'delay_pct': dict(zip(PERCENTILES, np.percentile(finished, PERCENTILES)))
+        if len(finished) else {q: np.nan for q in PERCENTILES},
+        'biz_pct': _percentiles(hist, PERCENTILES),
+        'interference': extra / max(n_steps * dt, dt),
+        'busy': busy / max(n_steps, 1),
+        'backlog': bucket.backlog,
+    }
+
+
+def synthetic_requests(rng, duration, period=1.0, rate=8 * 2**20, size=512 * 2**10, spread=0.2):
+    """快照写请求: 每个快照周期开始后 spread 秒内，写合并缓冲区下发若干个顺序写请求"""
+    starts = np.arange(0, duration, period)
+    counts = rng.poisson(rate * period / size, len(starts))
+    ts = np.repeat(starts, counts) + rng.random(counts.sum()) * spread
+    ts = np.sort(ts[ts < duration])
+    return ts, np.full(len(ts), float(size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SPI 反馈式令牌桶 I/O 节流模拟')
+    parser.add_argument('spi', nargs='?', default='spi_latency_sampled_data.csv',
+                        help='含 time,spi 列的 CSV，时间轴较短时按周期重复')
+    parser.add_argument('--duration', type=float, default=86400.0, help='模拟时长 (s)')
+    parser.add_argument('--dt', type=float, default=DT, help='时间步 (s)')
+    parser.add_argument('--rate', type=float, default=8.0, help='快照平均写入速率 (MB/s)')
+    parser.add_argument('--r-max', type=float, default=R_MAX / 2**20, help='R_max (MB/s)')
+    parser.add_argument('--capacity', type=float, default=CAPACITY / 2**20, help='桶容量 (MB)')
+    parser.add_argument('--device', type=float, default=B_DEV / 2**20, help='设备带宽 (MB/s)')
+    parser.add_argument('-o', '--out', help='输出 time,snap_bw,biz_bw 带宽曲线 (MB/s) 的 CSV')
+    args = parser.parse_args()
+
+    spi_t, spi = load_spi(args.spi)
+    req_t, req_bytes = synthetic_requests(np.random.default_rng(0), args.duration,
+                                          rate=args.rate * 2**20)
+    kw = dict(dt=args.dt, r_max=args.r_max * 2**20, capacity=args.capacity * 2**20,
+              b_dev=args.device * 2**20)
+
+    print(f'{len(req_t)} 个请求, {args.duration / args.dt:.0f} 个时间步')
+    print(f'{"":>8}{"耗时 (s)":>10}' + ''.join(f'{"p" + str(q):>9}' for q in PERCENTILES)
+          + f'{"业务 p99":>10}{"干扰 (ms)":>11}{"受扰":>8}{"积压 (MB)":>11}')
+    for name, adaptive in [('固定速率', False), ('SPI', True)]:
+        start = time.perf_counter()
+        res = simulate(req_t, req_bytes, spi_t, spi, args.duration, adaptive=adaptive, **kw)
+        elapsed = time.perf_counter() - start
+        print(f'{name:>8}{elapsed:>10.2f}'
+              + ''.join(f'{res["delay_pct"][q] * 1e3:>9.1f}' for q in PERCENTILES)
+              + f'{res["biz_pct"][99] * 1e3:>10.1f}{res["interference"] * 1e3:>11.3f}'
+              f'{res["busy"]:>8.1%}{res["backlog"] / 2**20:>11.1f}')
+    print('(时延单位 ms)')
+    if args.out:
+        pd.DataFrame({'time': res['time'], 'snap_bw': res['snap_bw'] / 2**20,
+                      'biz_bw': res['biz_bw'] / 2**20}).to_csv(args.out, index=False)
+
+
+if __name__ == '__main__':
+    main()
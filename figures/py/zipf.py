@@ -1,44 +1,25 @@
+import batch
+import dptrace
 import matplotlib.pyplot as plt
 import numpy as np
-import os
+import results
+import style
 
-# --- 1. 样式设置 ---
-plt.rcParams['font.sans-serif'] = ['SimHei', 'SimSun', 'Arial Unicode MS']
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.size'] = 14
-plt.rcParams['axes.linewidth'] = 1.5
-plt.rcParams['axes.unicode_minus'] = False
-plt.rcParams['xtick.direction'] = 'in'
-plt.rcParams['ytick.direction'] = 'in'
+# --- 1. 样式设置 (共用 style.py) ---
+style.apply()
 
 def plot_write_frequency_distribution_final():
     # --- 2. 数据准备 ---
     # 修改标签为 >=5
     x_labels = ['0', '1', '2', '3', '4', '>=5']
     
-    # 数据调整策略：
-    # 1. 大幅削减中间项 (2, 3, 4) 的数值，使其呈现更明显的"凹"字形或 L 形
-    # 2. >=5 的数据控制在 5% 以内 (7zip 除外)
-    # 3. 减少的数值回填给 0 (冷页面) 或 1
-    data = {
-        # Idle: 几乎全0
-        "空闲":    [99.6, 0.3,  0.0, 0.0, 0.0, 0.1],
-        
-        # SQLite: 中间极少，两头翘
-        "SQLite":         [78.0, 15.0, 1.0, 1.0, 0.5, 3.5], 
-        
-        # OpenCV: 
-        "OpenCV":         [70.0, 20.0, 0.9, 1.5, 1.3, 4.0],
-        
-        # TinyLlama: 
-        "TinyLlama":      [60.0, 32.8, 0.5, 0.8, 0.5, 4.2],
-        
-        # YOLO: 
-        "YOLO":           [52.0, 37.2, 1.3, 1.1, 1.2, 4.8],
-        
-        # 7zip: 允许稍微超一点 (6.5%)
-        "7zip":           [35.0, 43.5, 1.9, 1.7, 1.2, 8.5]
-    }
+    # 各负载的分桶占比 (%): traces/ 下有该负载的脏页 trace 时直接统计 (各负载并行)，
+    # 否则取结果库 results/ 中的 dirty_count_pct
+    workloads = ['Idle', 'SQLite', 'OpenCV', 'TinyLlama', 'YOLO', '7zip']
+    traces = {w: dptrace.find(w) for w in workloads}
+    measured = dptrace.dirty_counts_many({w: p for w, p in traces.items() if p})
+    data = {results.label(w): np.round(measured[w], 1) if w in measured
+            else results.series('dirty_count_pct', w, '-')[1] for w in workloads}
 
     # --- 3. 绘图参数 ---
     x = np.arange(len(x_labels)) 
@@ -111,7 +92,7 @@ def plot_write_frequency_distribution_final():
     # --- 6. 保存 ---
         
     plt.savefig('zipf.pdf', format='pdf', bbox_inches='tight')
-    plt.show()
+    batch.show(fig)
 
 if __name__ == "__main__":
     plot_write_frequency_distribution_final()
\ No newline at end of file